@@ -0,0 +1,45 @@
+"""depts.path / depth 回填并设为非空
+
+Revision ID: 922b2d1d7c79
+Revises:
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from app.dept.crud import rebuild_dept_paths
+
+
+# revision identifiers, used by Alembic.
+revision: str = '922b2d1d7c79'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    columns = {column["name"] for column in sa.inspect(bind).get_columns("depts")}
+    if "path" not in columns:
+        op.add_column("depts", sa.Column("path", sa.Text(collation="C"), nullable=True))
+        op.create_index("ix_depts_path", "depts", ["path"])
+    if "depth" not in columns:
+        op.add_column("depts", sa.Column("depth", sa.Integer(), server_default="0", nullable=False))
+
+    # 按 parent_id 重建全部路径；会话加入迁移事务，不单独提交
+    rebuild_dept_paths(Session(bind=bind))
+    unreachable = bind.execute(sa.text("SELECT id FROM depts WHERE path IS NULL LIMIT 10")).scalars().all()
+    if unreachable:
+        raise RuntimeError(f"以下部门的上级链路存在循环引用，无法生成路径，请先修正 parent_id：{', '.join(unreachable)}")
+
+    op.alter_column("depts", "path", existing_type=sa.Text(collation="C"), nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column("depts", "path", existing_type=sa.Text(collation="C"), nullable=True)
@@ -0,0 +1,37 @@
+"""新增角色-菜单关联表 role_menus
+
+Revision ID: fd85c3d537dc
+Revises: 922b2d1d7c79
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fd85c3d537dc'
+down_revision: Union[str, None] = '922b2d1d7c79'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 通过 create_all 建表的库中可能已存在
+    if sa.inspect(op.get_bind()).has_table("role_menus"):
+        return
+    op.create_table(
+        "role_menus",
+        sa.Column("role_id", sa.String(36), sa.ForeignKey("roles.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("menu_id", sa.Integer(), sa.ForeignKey("menus.id", ondelete="CASCADE"), primary_key=True),
+    )
+    op.create_index("ix_role_menus_menu_id", "role_menus", ["menu_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_role_menus_menu_id", table_name="role_menus")
+    op.drop_table("role_menus")
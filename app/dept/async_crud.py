@@ -0,0 +1,35 @@
+# app/dept/async_crud.py
+# 部门 CRUD 的异步版本：通过 AsyncSession.run_sync 复用同步实现，
+# 数据库 IO 由 asyncpg 在事件循环中完成，不占用线程池
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dept import crud, schemas
+from uuid import UUID
+from typing import Optional
+
+
+async def create_dept(db: AsyncSession, dept_in: schemas.DeptCreate):
+    return await db.run_sync(crud.create_dept, dept_in)
+
+
+async def get_dept(db: AsyncSession, dept_id: UUID):
+    return await db.run_sync(crud.get_dept, dept_id)
+
+
+async def get_all_dept(db: AsyncSession):
+    return await db.run_sync(crud.get_all_dept)
+
+
+async def get_dept_tree(db: AsyncSession, root_id: Optional[UUID] = None):
+    return await db.run_sync(crud.get_dept_tree, root_id)
+
+
+async def get_dept_page(db: AsyncSession, limit: int, cursor: Optional[str] = None, with_total: bool = False):
+    return await db.run_sync(crud.get_dept_page, limit, cursor, with_total)
+
+
+async def update_dept(db: AsyncSession, dept_id: UUID, dept_in: schemas.DeptUpdate):
+    return await db.run_sync(crud.update_dept, dept_id, dept_in)
+
+
+async def delete_dept(db: AsyncSession, dept_id: UUID, user_policy: schemas.DeptUserPolicy = "refuse"):
+    return await db.run_sync(crud.delete_dept, dept_id, user_policy)
@@ -0,0 +1,96 @@
+from fastapi import APIRouter, Depends, Query, Request, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+from app.dept import schemas, async_crud, crud
+from core.database import get_async_db
+from core.pagination import CursorParams
+from core.streaming import stream_list_response
+from core.http_cache import TableConditional
+from starlette.concurrency import run_in_threadpool
+from core.schemas.base import CursorPage
+from utils.response import fast_response
+from uuid import UUID
+
+# 异步模式下的部门路由（DB_ASYNC_MODE=true 时代替同步路由注册；批量导入使用共用的同步路由 dept_shared_router）
+async_dept_router = APIRouter(prefix="/dept", tags=["部门管理"])
+
+
+@async_dept_router.post(
+    "/create",
+    response_model=schemas.BaseResponse[schemas.DeptOut],
+    summary="创建部门",
+    description="创建新部门"
+)
+async def create_async(dept_in: schemas.DeptCreate, db: AsyncSession = Depends(get_async_db)):
+    dept = await async_crud.create_dept(db, dept_in)
+    return {"data": dept, "message": "部门创建成功"}
+
+
+@async_dept_router.get(
+    "/list",
+    response_model=schemas.BaseResponse[Union[List[schemas.DeptOut], CursorPage[schemas.DeptOut]]],
+    summary="获取部门列表",
+    description="不传 limit/cursor 时返回全部部门；传入后按部门编码游标翻页"
+)
+async def list_all_async(
+        request: Request,
+        page: CursorParams = Depends(),
+        stream: bool = Query(False, description="流式输出全部数据（未分页时生效）"),
+        db: AsyncSession = Depends(get_async_db)
+):
+    conditional = TableConditional(request, "depts")
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+    if page.enabled:
+        return conditional.apply(fast_response(await async_crud.get_dept_page(db, page.limit, page.cursor, page.with_total), schemas.DeptPageResponse))
+    if stream:
+        # 流式输出使用同步会话与服务端游标，在线程池中建立查询
+        return conditional.apply(await run_in_threadpool(stream_list_response, request, crud.iter_all_dept, schemas.DeptOut))
+    depts = await async_crud.get_all_dept(db)
+    return conditional.apply(fast_response(depts))
+
+
+@async_dept_router.get(
+    "/tree",
+    response_model=schemas.BaseResponse[List[schemas.DeptTreeOut]],
+    summary="获取部门树",
+    description="嵌套结构的部门树；传入 root_id 时只返回该部门及其下级部门"
+)
+async def tree_async(
+        request: Request,
+        root_id: Optional[UUID] = Query(None, description="子树根部门ID"),
+        db: AsyncSession = Depends(get_async_db)
+):
+    conditional = TableConditional(request, "depts")
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+    return conditional.apply(fast_response(await async_crud.get_dept_tree(db, root_id)))
+
+
+@async_dept_router.put(
+    "/update/{dept_id}",
+    response_model=schemas.BaseResponse[schemas.DeptOut],
+    summary="更新部门",
+    description="更新部门信息"
+)
+async def update_async(dept_id: UUID, dept_in: schemas.DeptUpdate, db: AsyncSession = Depends(get_async_db)):
+    dept = await async_crud.update_dept(db, dept_id, dept_in)
+    return {"data": dept, "message": "部门更新成功"}
+
+
+@async_dept_router.delete(
+    "/delete/{dept_id}",
+    response_model=schemas.BaseResponse[schemas.DeptDeleteResult],
+    summary="删除部门",
+    description="删除部门及其全部下级部门；user_policy 指定这些部门下用户的处理方式：refuse 有用户时拒绝（默认），"
+                "detach 置空所属部门，reassign 转到被删部门的上级部门"
+)
+async def delete_async(
+        dept_id: UUID,
+        user_policy: schemas.DeptUserPolicy = Query("refuse", description="子树内用户的处理方式"),
+        db: AsyncSession = Depends(get_async_db)
+):
+    result = await async_crud.delete_dept(db, dept_id, user_policy)
+    if not result:
+        raise HTTPException(status_code=404, detail="部门不存在")
+    return {"data": result, "message": "删除成功"}
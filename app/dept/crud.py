@@ -1,9 +1,20 @@
+import uuid
+from sqlalchemy import delete, func, insert, literal, select, update
 from sqlalchemy.orm import Session
 from app.dept import models, schemas
+from app.dept.tree import dept_tree
+from app.user.models import User
 from uuid import UUID
-from core.exceptions import BusinessException
+from core.config import settings
+from core.principal import principal_cache
+from core.table_versions import table_versions
+from core.exceptions import BusinessException, integrity_sqlstate, raise_for_unique_violation
 from fastapi import status
+from pydantic import ValidationError
 from sqlalchemy.exc import IntegrityError
+from typing import Any, Dict, List, Optional, Union
+from core.pagination import estimate_count, keyset_page
+from utils.importer import chunks, validation_messages
 
 
 def get_dept_by_name(db: Session, name: str):
@@ -14,28 +25,33 @@ def get_dept_by_code(db: Session, code: str):
     return db.query(models.Dept).filter(models.Dept.code == code).first()
 
 
-# 部门创建
+# 部门创建：直接 INSERT ... RETURNING，名称/编码重复由唯一约束判定，一次往返
 def create_dept(db: Session, dept_in: schemas.DeptCreate):
-    # 检查名称冲突
-    if get_dept_by_name(db, dept_in.name):
-        raise BusinessException(
-            entity="部门名称",
-            error_type="已存在",
-        )
-    if get_dept_by_code(db, dept_in.code):
-        raise BusinessException(
-            entity="部门编码",
-            error_type="已存在",
-        )
-
+    values = dept_in.model_dump(mode="json")  # UUID 转为字符串，兼容 asyncpg 严格类型
+    values["id"] = str(uuid.uuid4())
+    if values.get("parent_id"):
+        # 路径与层级由上级部门在同一条语句中计算得出；上级部门不存在时路径为 NULL，由非空约束拒绝
+        parent = select(models.Dept.path, models.Dept.depth).where(models.Dept.id == values["parent_id"]).subquery()
+        values["path"] = select(parent.c.path).scalar_subquery() + f"{values['id']}/"
+        values["depth"] = select(parent.c.depth + 1).scalar_subquery()
+    else:
+        values["path"], values["depth"] = f"/{values['id']}/", 0
     try:
-        dept = models.Dept(**dept_in.model_dump())
-        db.add(dept)
+        dept = db.scalars(insert(models.Dept).values(**values).returning(models.Dept)).one()
+        db.expunge(dept)  # 提交后不过期，返回时无需再次查询
         db.commit()
-        db.refresh(dept)
+        dept_tree.invalidate()
+        table_versions.bump("depts")
         return dept
     except IntegrityError as e:
         db.rollback()
+        raise_for_unique_violation(e, {"name": "部门名称", "code": "部门编码"})
+        if values.get("parent_id") and integrity_sqlstate(e) in ("23502", "23503"):
+            raise BusinessException(
+                entity="上级部门",
+                error_type="不存在",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
         raise BusinessException(
             entity="department",
             error_type="database_error",
@@ -44,12 +60,285 @@ def create_dept(db: Session, dept_in: schemas.DeptCreate):
         )
 
 
+def bulk_import_depts(db: Session, rows: List[Dict[str, Any]]) -> dict:
+    """
+    批量导入部门树
+    上级部门可通过 parent_code（文件内或库中已有部门的编码）、parent_id（库中已有部门）
+    或嵌套 JSON 的 children 指定
+    1. 逐行校验字段，检查文件内名称/编码重复，集合查询与库中已有部门的冲突及上级部门是否存在
+    2. 内存中按层级拓扑排序，校验失败行的下级部门一并跳过，循环引用单独报错
+    3. 在 Python 中预先生成 id，逐层多行插入，整体一个事务
+    :return: 导入报告，errors 中的 row 为数据行序号（从 1 开始）
+    """
+    errors = {}  # row -> [错误信息]
+    candidates = {}  # row -> (DeptCreate, 上级引用)
+    seen = {"name": {}, "code": {}}
+    labels = {"name": "部门名称", "code": "部门编码"}
+
+    for row_no, raw in enumerate(rows, start=1):
+        raw = dict(raw)
+        parent_code = raw.pop("parent_code", None)
+        parent_row = raw.pop("_parent_row", None)
+        try:
+            dept_in = schemas.DeptCreate(**raw)
+        except ValidationError as e:
+            errors[row_no] = validation_messages(e)
+            continue
+        if sum(ref is not None for ref in (parent_code, parent_row, dept_in.parent_id)) > 1:
+            errors[row_no] = ["parent_code、parent_id 与嵌套上级只能指定一个"]
+            continue
+        row_errors = []
+        for field, values in seen.items():
+            value = getattr(dept_in, field)
+            if value is None:
+                continue
+            if value in values:
+                row_errors.append(f"{labels[field]}与第 {values[value]} 行重复")
+            else:
+                values[value] = row_no
+        if row_errors:
+            errors[row_no] = row_errors
+            continue
+        if parent_row is not None:
+            parent = ("row", parent_row)
+        elif parent_code is not None:
+            parent = ("code", str(parent_code))
+        elif dept_in.parent_id is not None:
+            parent = ("id", str(dept_in.parent_id))
+        else:
+            parent = None
+        candidates[row_no] = (dept_in, parent)
+
+    # 与数据库已有部门的唯一性冲突：每批一条查询
+    existing = {"name": set(), "code": set()}
+    for field in existing:
+        column = getattr(models.Dept, field)
+        values = [getattr(dept_in, field) for dept_in, _ in candidates.values() if getattr(dept_in, field) is not None]
+        for batch in chunks(values, settings.IMPORT_BATCH_SIZE):
+            existing[field].update(db.scalars(select(column).where(column.in_(batch))))
+
+    # 上级部门引用：文件内编码优先，其余到库中按编码 / id 查找
+    file_codes = seen["code"]
+    external_codes = {ref for _, (kind, ref) in _parents(candidates) if kind == "code" and ref not in file_codes}
+    external_ids = {ref for _, (kind, ref) in _parents(candidates) if kind == "id"}
+    found_codes, found_ids = {}, {}  # 编码 -> id；id -> (path, depth)
+    for batch in chunks(list(external_codes), settings.IMPORT_BATCH_SIZE):
+        for dept_id, code, path, depth in db.execute(
+                select(models.Dept.id, models.Dept.code, models.Dept.path, models.Dept.depth)
+                .where(models.Dept.code.in_(batch))
+        ):
+            found_codes[code] = dept_id
+            found_ids[dept_id] = (path, depth)
+    for batch in chunks(list(external_ids), settings.IMPORT_BATCH_SIZE):
+        for dept_id, path, depth in db.execute(
+                select(models.Dept.id, models.Dept.path, models.Dept.depth).where(models.Dept.id.in_(batch))
+        ):
+            found_ids[dept_id] = (path, depth)
+
+    parent_of = {}  # row -> ("row", 上级行号) | ("id", 已有部门id) | None
+    for row_no, (dept_in, parent) in list(candidates.items()):
+        row_errors = [
+            f"{labels[field]}已存在" for field in existing
+            if getattr(dept_in, field) is not None and getattr(dept_in, field) in existing[field]
+        ]
+        if parent is not None:
+            kind, ref = parent
+            if kind == "code" and ref in file_codes:
+                parent = ("row", file_codes[ref])
+            elif kind == "code":
+                parent = ("id", found_codes[ref]) if ref in found_codes else None
+                if parent is None:
+                    row_errors.append(f"上级部门编码 {ref} 不存在")
+            elif kind == "id" and ref not in found_ids:
+                row_errors.append("上级部门不存在")
+        if row_errors:
+            errors[row_no] = row_errors
+            del candidates[row_no]
+        else:
+            parent_of[row_no] = parent
+
+    # 拓扑排序：从上级为空或为已有部门的行开始逐层展开
+    children = {}
+    levels = [[]]
+    for row_no, parent in parent_of.items():
+        if parent is not None and parent[0] == "row":
+            children.setdefault(parent[1], []).append(row_no)
+        else:
+            levels[0].append(row_no)
+    while True:
+        next_level = [child for row_no in levels[-1] for child in children.get(row_no, ())]
+        if not next_level:
+            break
+        levels.append(next_level)
+
+    placed = {row_no for level in levels for row_no in level}
+    for row_no in parent_of:
+        if row_no in placed:
+            continue
+        # 未能排入层级：祖先校验失败，或上级链路构成循环
+        ancestor, visited = parent_of[row_no], {row_no}
+        while ancestor is not None and ancestor[0] == "row" and ancestor[1] in parent_of and ancestor[1] not in visited:
+            visited.add(ancestor[1])
+            ancestor = parent_of[ancestor[1]]
+        if ancestor is not None and ancestor[0] == "row" and ancestor[1] not in parent_of:
+            errors[row_no] = [f"上级部门（第 {ancestor[1]} 行）导入失败"]
+        else:
+            errors[row_no] = ["上级部门存在循环引用"]
+
+    ids = {row_no: str(uuid.uuid4()) for row_no in placed}
+    paths = {}  # row -> (path, depth)，逐层由上级推出
+    try:
+        for level in levels:
+            values = []
+            for row_no in level:
+                dept_in = candidates[row_no][0]
+                parent = parent_of[row_no]
+                if parent is None:
+                    parent_path, parent_depth = "/", -1
+                else:
+                    parent_path, parent_depth = paths[parent[1]] if parent[0] == "row" else found_ids[parent[1]]
+                paths[row_no] = (f"{parent_path}{ids[row_no]}/", parent_depth + 1)
+                values.append({
+                    "id": ids[row_no],
+                    "name": dept_in.name,
+                    "code": dept_in.code,
+                    "leader": dept_in.leader,
+                    "phone": dept_in.phone,
+                    "email": dept_in.email,
+                    "is_active": dept_in.is_active if dept_in.is_active is not None else True,
+                    "remark": dept_in.remark,
+                    "parent_id": None if parent is None else ids[parent[1]] if parent[0] == "row" else parent[1],
+                    "path": paths[row_no][0],
+                    "depth": paths[row_no][1],
+                })
+            for batch in chunks(values, settings.IMPORT_BATCH_SIZE):
+                db.execute(insert(models.Dept), batch)
+        db.commit()
+        dept_tree.invalidate()
+        table_versions.bump("depts")
+    except IntegrityError as e:
+        # 校验之后被并发写入抢先，整棵树回滚
+        db.rollback()
+        raise BusinessException(
+            entity="部门导入",
+            error_type="写入冲突",
+            details=str(e.orig),
+            status_code=status.HTTP_409_CONFLICT
+        )
+
+    return {
+        "total": len(rows),
+        "created": len(placed),
+        "failed": len(errors),
+        "errors": [
+            {"row": row_no, "name": rows[row_no - 1].get("name"), "errors": messages}
+            for row_no, messages in sorted(errors.items())
+        ]
+    }
+
+
+def _parents(candidates: dict):
+    return ((row_no, parent) for row_no, (_, parent) in candidates.items() if parent is not None)
+
+
+def subtree_filter(path):
+    """
+    路径前缀范围条件：path 为部门路径（字符串或 SQL 表达式），匹配该部门及全部下级部门；
+    路径只含 uuid 字符和 /，均小于 ~，范围查询可直接使用 path 索引
+    """
+    return (models.Dept.path >= path) & (models.Dept.path < path + literal("~"))
+
+
+def rebuild_dept_paths(db: Session) -> int:
+    """
+    按 parent_id 重建全部部门的 path / depth（递归 CTE + 一条 UPDATE），用于新增列后的回填或数据修复
+    存在循环引用的部门不可达，其路径保持不变
+    :return: 更新的行数
+    """
+    dept = models.Dept
+    tree = select(
+        dept.id,
+        (literal("/") + dept.id + "/").label("path"),
+        literal(0).label("depth"),
+    ).where(dept.parent_id.is_(None)).cte("tree", recursive=True)
+    child = dept.__table__.alias("child")
+    tree = tree.union_all(
+        select(
+            child.c.id,
+            (tree.c.path + child.c.id + "/").label("path"),
+            (tree.c.depth + 1).label("depth"),
+        ).where(child.c.parent_id == tree.c.id)
+    )
+    result = db.execute(
+        update(dept.__table__).where(dept.__table__.c.id == tree.c.id).values(path=tree.c.path, depth=tree.c.depth)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def _move_subtree(db: Session, dept: models.Dept, new_parent_id: Optional[str]):
+    """
+    调整上级部门：校验新上级不是本部门或其下级（新上级路径中是否含本部门 id，O(depth)），
+    然后用一条 UPDATE 改写整棵子树的路径与层级
+    """
+    if new_parent_id is None:
+        new_path, new_depth = f"/{dept.id}/", 0
+    else:
+        parent = db.query(models.Dept.path, models.Dept.depth).filter(models.Dept.id == new_parent_id).first()
+        if not parent:
+            raise BusinessException(
+                entity="上级部门",
+                error_type="不存在",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        if f"/{dept.id}/" in parent.path:
+            raise BusinessException(
+                entity="上级部门",
+                error_type="不能是本部门或其下级部门",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        new_path, new_depth = f"{parent.path}{dept.id}/", parent.depth + 1
+
+    old_path = dept.path
+    db.execute(
+        update(models.Dept)
+        .where(subtree_filter(old_path))
+        .values(
+            path=new_path + func.substr(models.Dept.path, len(old_path) + 1),
+            depth=models.Dept.depth + (new_depth - dept.depth),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
 def get_dept(db: Session, dept_id: UUID):
-    return db.query(models.Dept).filter(models.Dept.id == dept_id).first()
+    return db.query(models.Dept).filter(models.Dept.id == str(dept_id)).first()
 
 
 def get_all_dept(db: Session):
-    return db.query(models.Dept).order_by(models.Dept.code.asc()).all()
+    """全部部门（按编码排序），读取进程内部门树索引"""
+    return dept_tree.get(db).items
+
+
+def get_dept_tree(db: Session, root_id: Optional[Union[UUID, str]] = None):
+    """嵌套部门树，root_id 为空时返回全部顶级部门"""
+    return dept_tree.get(db).nested(root_id)
+
+
+def iter_all_dept(db: Session, chunk_size: int = 500):
+    """按编码排序分批读取全部部门（服务端游标），用于流式输出"""
+    return db.query(models.Dept).order_by(models.Dept.code.asc()).yield_per(chunk_size)
+
+
+def get_dept_page(db: Session, limit: int, cursor: Optional[str] = None, with_total: bool = False):
+    """按部门编码游标翻页"""
+    query = db.query(models.Dept)
+    items, next_cursor = keyset_page(query, models.Dept.code, models.Dept.id, limit, cursor)
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "total_estimate": estimate_count(db, query) if with_total else None
+    }
 
 
 # 部门更新
@@ -82,11 +371,15 @@ def update_dept(db: Session, dept_id: UUID, dept_in: schemas.DeptUpdate):
         )
     try:
         # 更新字段
-        update_data = dept_in.model_dump(exclude_unset=True)
+        update_data = dept_in.model_dump(exclude_unset=True, mode="json")
+        if "parent_id" in update_data and update_data["parent_id"] != db_dept.parent_id:
+            _move_subtree(db, db_dept, update_data["parent_id"])
         for key, value in update_data.items():
             setattr(db_dept, key, value)
 
         db.commit()
+        dept_tree.invalidate()
+        table_versions.bump("depts")
         db.refresh(db_dept)
         return db_dept
     except IntegrityError as e:
@@ -99,28 +392,52 @@ def update_dept(db: Session, dept_id: UUID, dept_in: schemas.DeptUpdate):
         )
 
 
-# 部门删除
-def delete_dept(db: Session, dept_id: UUID):
-    # 获取要删除的部门
+# 部门删除：整棵子树一条 DELETE，子树内用户按 user_policy 一条 UPDATE 处理
+def delete_dept(db: Session, dept_id: UUID, user_policy: schemas.DeptUserPolicy = "refuse"):
     dept = db.query(models.Dept).filter(models.Dept.id == str(dept_id)).first()
     if not dept:
         return None
 
+    subtree_ids = select(models.Dept.id).where(subtree_filter(dept.path))
+    in_subtree = User.dept_id.in_(subtree_ids)
     try:
-        # 递归删除所有子部门
-        def delete_children(parent_id):
-            children = db.query(models.Dept).filter(models.Dept.parent_id == parent_id).all()
-            for child in children:
-                delete_children(str(child.id))  # 递归删除子部门
-                db.delete(child)  # 删除当前子部门
-
-        # 先删除所有子部门
-        delete_children(str(dept_id))
-
-        # 最后删除当前部门
-        db.delete(dept)
+        affected_users = 0
+        if user_policy == "refuse":
+            user_count = db.scalar(select(func.count()).select_from(User).where(in_subtree))
+            if user_count:
+                raise BusinessException(
+                    entity="部门",
+                    error_type="存在用户",
+                    details=f"部门及其下级部门共有 {user_count} 名用户，请先调整用户所属部门",
+                    status_code=status.HTTP_409_CONFLICT
+                )
+        else:
+            if user_policy == "reassign" and dept.parent_id is None:
+                raise BusinessException(
+                    entity="部门",
+                    error_type="没有上级部门",
+                    details="顶级部门的用户无法转移到上级部门",
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
+            new_dept_id = dept.parent_id if user_policy == "reassign" else None
+            affected_users = db.execute(
+                update(User).where(in_subtree).values(dept_id=new_dept_id)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+
+        deleted_depts = db.execute(
+            delete(models.Dept).where(subtree_filter(dept.path)).execution_options(synchronize_session=False)
+        ).rowcount
         db.commit()
-        return dept
+        dept_tree.invalidate()
+        table_versions.bump("depts")
+        if affected_users:
+            table_versions.bump("users")
+            principal_cache.clear()  # 缓存的主体中所属部门已变化
+        return {"deleted_depts": deleted_depts, "affected_users": affected_users, "user_policy": user_policy}
+    except BusinessException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise BusinessException(
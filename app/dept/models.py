@@ -1,7 +1,7 @@
 # apps/dept/models.py
 
 from core.database import Base
-from sqlalchemy import Column, String, Boolean, ForeignKey
+from sqlalchemy import Column, String, Boolean, ForeignKey, Integer, Text
 from sqlalchemy.orm import relationship
 import uuid
 
@@ -21,6 +21,12 @@ class Dept(Base):
 
     parent_id = Column(String(36), ForeignKey("depts.id", ondelete="CASCADE"), nullable=True)  # 上级部门ID
 
+    # 物化路径：根到本部门的 id 链，形如 /<根id>/<上级id>/<本部门id>/，由 crud 维护
+    # 已有数据库通过 alembic 迁移（或 python -m utils.rebuild_dept_paths）回填后设为非空
+    # C 排序规则下普通 B-tree 索引即可支持前缀（LIKE 'x%'）与范围查询，子树一次索引扫描
+    path = Column(Text(collation="C"), index=True, nullable=False)
+    depth = Column(Integer, default=0, server_default="0", nullable=False)  # 层级，根部门为 0
+
     # 关系映射
     users = relationship("User", back_populates="dept")
 
@@ -1,12 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, Query, Request, HTTPException, UploadFile
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Union
 from app.dept import schemas, crud
+from core.auth import is_superuser
+from core.config import settings
 from core.database import get_db
+from core.pagination import CursorParams
+from core.streaming import stream_list_response
+from core.http_cache import TableConditional
+from core.schemas.base import CursorPage, ImportReport
+from utils.importer import read_import_rows
+from utils.response import fast_response
 from uuid import UUID
 
 dept_router = APIRouter(prefix="/dept", tags=["部门管理"])
 
+# 两种数据库模式共用的同步路由（异步模式下不另行实现）：批量导入读取上传文件、大批量写入，在线程池中使用同步会话
+dept_shared_router = APIRouter(prefix="/dept", tags=["部门管理"])
+
 
 @dept_router.post(
     "/create",
@@ -19,14 +30,62 @@ def create(dept_in: schemas.DeptCreate, db: Session = Depends(get_db)):
     return {"data": dept, "message": "部门创建成功"}
 
 
+@dept_shared_router.post(
+    "/import",
+    response_model=schemas.BaseResponse[ImportReport],
+    summary="批量导入部门",
+    description="上传嵌套 JSON（children 表示下级部门）、CSV 或 JSON Lines（parent_code 指定上级部门编码）；"
+                "返回逐行错误报告，校验通过的部门在一个事务中逐层导入"
+)
+def import_depts(
+        file: UploadFile = File(..., description="JSON、CSV 或 JSON Lines 文件"),
+        db: Session = Depends(get_db),
+        current_user=Depends(is_superuser)
+):
+    rows = read_import_rows(file, entity="部门导入", max_rows=settings.IMPORT_MAX_ROWS)
+    report = crud.bulk_import_depts(db, rows)
+    return {"data": report, "message": f"导入完成：成功 {report['created']} 条，失败 {report['failed']} 条"}
+
+
 @dept_router.get(
     "/list",
-    response_model=schemas.BaseResponse[List[schemas.DeptOut]],
+    response_model=schemas.BaseResponse[Union[List[schemas.DeptOut], CursorPage[schemas.DeptOut]]],
     summary="获取部门列表",
+    description="不传 limit/cursor 时返回全部部门；传入后按部门编码游标翻页"
 )
-def list_all(db: Session = Depends(get_db)):
+def list_all(
+        request: Request,
+        page: CursorParams = Depends(),
+        stream: bool = Query(False, description="流式输出全部数据（未分页时生效）"),
+        db: Session = Depends(get_db)
+):
+    conditional = TableConditional(request, "depts")
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+    if page.enabled:
+        return conditional.apply(fast_response(crud.get_dept_page(db, page.limit, page.cursor, page.with_total), schemas.DeptPageResponse))
+    if stream:
+        return conditional.apply(stream_list_response(request, crud.iter_all_dept, schemas.DeptOut))
+    # 部门树索引中的 dict 与 DeptOut 字段一致，直接编码
     depts = crud.get_all_dept(db)
-    return {"data": depts}
+    return conditional.apply(fast_response(depts))
+
+
+@dept_router.get(
+    "/tree",
+    response_model=schemas.BaseResponse[List[schemas.DeptTreeOut]],
+    summary="获取部门树",
+    description="嵌套结构的部门树；传入 root_id 时只返回该部门及其下级部门"
+)
+def tree(
+        request: Request,
+        root_id: Optional[UUID] = Query(None, description="子树根部门ID"),
+        db: Session = Depends(get_db)
+):
+    conditional = TableConditional(request, "depts")
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+    return conditional.apply(fast_response(crud.get_dept_tree(db, root_id)))
 
 
 @dept_router.put(
@@ -42,11 +101,17 @@ def update(dept_id: UUID, dept_in: schemas.DeptUpdate, db: Session = Depends(get
 
 @dept_router.delete(
     "/delete/{dept_id}",
-    response_model=schemas.BaseResponse[None],
-    summary="删除部门"
+    response_model=schemas.BaseResponse[schemas.DeptDeleteResult],
+    summary="删除部门",
+    description="删除部门及其全部下级部门；user_policy 指定这些部门下用户的处理方式：refuse 有用户时拒绝（默认），"
+                "detach 置空所属部门，reassign 转到被删部门的上级部门"
 )
-def delete(dept_id: UUID, db: Session = Depends(get_db)):
-    success = crud.delete_dept(db, dept_id)
-    if not success:
+def delete(
+        dept_id: UUID,
+        user_policy: schemas.DeptUserPolicy = Query("refuse", description="子树内用户的处理方式"),
+        db: Session = Depends(get_db)
+):
+    result = crud.delete_dept(db, dept_id, user_policy)
+    if not result:
         raise HTTPException(status_code=404, detail="部门不存在")
-    return {"message": "删除成功"}
+    return {"data": result, "message": "删除成功"}
@@ -1,8 +1,8 @@
 # apps/dept/schemas.py
 from pydantic import BaseModel, Field
-from typing import Optional, TypeVar
+from typing import List, Literal, Optional, TypeVar
 from uuid import UUID
-from core.schemas.base import BaseResponse, ErrorResponse  # 引入公共模型
+from core.schemas.base import BaseResponse, CursorPage, ErrorResponse, response_adapter  # 引入公共模型
 
 T = TypeVar('T')
 
@@ -34,3 +34,21 @@ class DeptOut(DeptBase):
         json_encoders = {
             UUID: lambda v: str(v)
         }
+
+
+class DeptTreeOut(DeptOut):
+    children: List["DeptTreeOut"] = Field(default_factory=list, description="下级部门")
+
+
+# 部门分页接口的响应序列化器（模块加载时构建）
+DeptPageResponse = response_adapter(CursorPage[DeptOut])
+
+
+# 删除部门时子树内用户的处理方式：detach 置空部门；reassign 转到被删部门的上级；refuse 有用户时拒绝删除
+DeptUserPolicy = Literal["detach", "reassign", "refuse"]
+
+
+class DeptDeleteResult(BaseModel):
+    deleted_depts: int = Field(..., description="删除的部门数（含下级部门）")
+    affected_users: int = Field(..., description="调整了所属部门的用户数")
+    user_policy: DeptUserPolicy = Field(..., description="用户处理方式")
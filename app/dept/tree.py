@@ -0,0 +1,67 @@
+# app/dept/tree.py
+# 进程内部门树索引：一次查询载入全部部门，建立 id -> 节点、上级 -> 下级列表以及每个部门的子树 id 集合，
+# /dept/list、/dept/tree 与用户列表的部门筛选直接查内存；
+# 部门写操作提交后调用 dept_tree.invalidate()，下次读取时重建；
+# 多 worker 部署时其他进程感知不到失效，由 DEPT_TREE_TTL_SECONDS 兜底
+from typing import Dict, FrozenSet, List, Optional
+from sqlalchemy.orm import Session
+from app.dept import models
+from core.config import settings
+from core.snapshot import SnapshotCache
+
+_FIELDS = ("id", "name", "code", "leader", "phone", "email", "is_active", "remark", "parent_id")
+
+
+class DeptTree:
+    """某一时刻的部门树快照（只读）"""
+
+    def __init__(self, depts: List[models.Dept]):
+        # 按部门编码排序的全部部门，与 get_all_dept 的顺序一致
+        self.items: List[dict] = [{field: getattr(dept, field) for field in _FIELDS} for dept in depts]
+        self.nodes: Dict[str, dict] = {item["id"]: item for item in self.items}
+        self.children: Dict[Optional[str], List[str]] = {}
+        for item in self.items:
+            # 上级不存在（数据不一致）的部门按顶级部门处理
+            parent_id = item["parent_id"] if item["parent_id"] in self.nodes else None
+            self.children.setdefault(parent_id, []).append(item["id"])
+
+        # 自底向上合并得到每个部门的子树 id 集合（含自身）
+        self.descendants: Dict[str, FrozenSet[str]] = {}
+        for dept_id in reversed(self._preorder()):
+            subtree = {dept_id}
+            for child_id in self.children.get(dept_id, ()):
+                subtree |= self.descendants[child_id]
+            self.descendants[dept_id] = frozenset(subtree)
+        self._nested = None
+
+    def _preorder(self) -> List[str]:
+        order, stack = [], list(reversed(self.children.get(None, [])))
+        while stack:
+            dept_id = stack.pop()
+            order.append(dept_id)
+            stack.extend(reversed(self.children.get(dept_id, [])))
+        return order
+
+    def subtree_ids(self, dept_id: str) -> FrozenSet[str]:
+        """部门及其全部下级部门的 id，部门不存在时为空集合"""
+        return self.descendants.get(str(dept_id), frozenset())
+
+    def nested(self, root_id: Optional[str] = None) -> List[dict]:
+        """嵌套结构（children 为下级部门列表）；root_id 为空时返回全部顶级部门"""
+        if self._nested is None:
+            self._nested = {dept_id: dict(self.nodes[dept_id], children=[]) for dept_id in self.nodes}
+            for parent_id, child_ids in self.children.items():
+                if parent_id is not None:
+                    self._nested[parent_id]["children"] = [self._nested[child_id] for child_id in child_ids]
+        if root_id is None:
+            return [self._nested[dept_id] for dept_id in self.children.get(None, [])]
+        node = self._nested.get(str(root_id))
+        return [node] if node is not None else []
+
+
+def build_dept_tree(db: Session) -> DeptTree:
+    return DeptTree(db.query(models.Dept).order_by(models.Dept.code.asc()).all())
+
+
+# 使用示例：dept_tree.get(db).subtree_ids(dept_id)
+dept_tree = SnapshotCache(build_dept_tree, ttl_seconds=settings.DEPT_TREE_TTL_SECONDS)
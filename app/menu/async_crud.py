@@ -0,0 +1,39 @@
+# app/menu/async_crud.py
+# 菜单 CRUD 的异步版本，基于 AsyncSession.run_sync 复用同步实现
+# children 为懒加载关系，返回前须在 run_sync 内完成序列化，避免在事件循环中触发隐式 IO
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.menu import crud, schemas
+from typing import List, Optional, Tuple
+
+
+def _menu_out(db, crud_fn, *args) -> schemas.MenuOut:
+    return schemas.MenuOut.model_validate(crud_fn(db, *args))
+
+
+def _menus_tree_out(db, menu_id: Optional[int] = None) -> List[schemas.MenuOut]:
+    return [schemas.MenuOut.model_validate(menu) for menu in crud.get_menus_tree(db, menu_id)]
+
+
+async def create_menu(db: AsyncSession, menu_in: schemas.MenuCreate) -> schemas.MenuOut:
+    return await db.run_sync(_menu_out, crud.create_menu, menu_in)
+
+
+async def get_menus_tree(db: AsyncSession, menu_id: Optional[int] = None) -> List[schemas.MenuOut]:
+    return await db.run_sync(_menus_tree_out, menu_id)
+
+
+async def get_router_payload(
+        db: AsyncSession,
+        menu_id: Optional[int] = None,
+        role_id: Optional[str] = None,
+        full_access: bool = False
+) -> Tuple[str, bytes]:
+    return await db.run_sync(crud.get_router_payload, menu_id, role_id, full_access)
+
+
+async def update_menu(db: AsyncSession, menu_id: int, menu_in: schemas.MenuUpdate) -> schemas.MenuOut:
+    return await db.run_sync(_menu_out, crud.update_menu, menu_id, menu_in)
+
+
+async def delete_menu(db: AsyncSession, menu_id: int) -> None:
+    await db.run_sync(crud.delete_menu, menu_id)
@@ -0,0 +1,84 @@
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.menu import schemas, async_crud
+from core.database import get_async_db
+from core.auth import get_current_user_async
+from core.http_cache import TableConditional, cached_json_response
+from core.schemas.base import BaseResponse
+from utils.response import fast_response
+from typing import List, Optional
+
+# 异步模式下的菜单路由（DB_ASYNC_MODE=true 时代替同步路由注册）
+async_menu_router = APIRouter(prefix="/menu", tags=["菜单管理"])
+
+
+@async_menu_router.post(
+    "/create",
+    response_model=BaseResponse[schemas.MenuOut],
+    summary="创建菜单",
+    description="创建新菜单"
+)
+async def create_async(menu_in: schemas.MenuCreate, db: AsyncSession = Depends(get_async_db)):
+    menu = await async_crud.create_menu(db, menu_in)
+    return {"data": menu, "message": "菜单创建成功"}
+
+
+@async_menu_router.get(
+    "/list",
+    response_model=BaseResponse[List[schemas.MenuOut]],
+    summary="获取菜单树",
+    description="获取所有菜单并以树形结构返回"
+)
+async def get_menu_tree_async(
+        request: Request,
+        menu_id: Optional[int] = None,
+        db: AsyncSession = Depends(get_async_db)
+):
+    conditional = TableConditional(request, "menus")
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+    menus = await async_crud.get_menus_tree(db, menu_id)
+    return conditional.apply(fast_response(menus, schemas.MenuListResponse, message="菜单获取成功"))
+
+
+@async_menu_router.get(
+    "/getRouter",
+    response_model=BaseResponse[List[schemas.MenuOut]],
+    summary="获取菜单树",
+    description="返回当前用户角色可访问的菜单树（超级用户返回全部菜单）；"
+                "响应带 ETag，携带 If-None-Match 且菜单未变化时返回 304"
+)
+async def get_router_async(
+        request: Request,
+        menu_id: Optional[int] = None,
+        db: AsyncSession = Depends(get_async_db),
+        current_user=Depends(get_current_user_async)
+):
+    etag, body = await async_crud.get_router_payload(db, menu_id, current_user.role_id, current_user.is_superuser)
+    return cached_json_response(request, etag, body)
+
+
+@async_menu_router.put(
+    "/update/{menu_id}",
+    response_model=BaseResponse[schemas.MenuOut],
+    summary="更新菜单",
+    description="更新指定菜单的信息"
+)
+async def update_menu_async(
+        menu_id: int,
+        menu_in: schemas.MenuUpdate,
+        db: AsyncSession = Depends(get_async_db)
+):
+    menu = await async_crud.update_menu(db, menu_id, menu_in)
+    return {"data": menu, "message": "菜单更新成功"}
+
+
+@async_menu_router.delete(
+    "/delete/{menu_id}",
+    response_model=BaseResponse[None],
+    summary="删除菜单",
+    description="删除指定菜单"
+)
+async def delete_menu_async(menu_id: int, db: AsyncSession = Depends(get_async_db)):
+    await async_crud.delete_menu(db, menu_id)
+    return {"data": None, "message": "菜单删除成功"}
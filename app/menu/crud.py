@@ -1,10 +1,14 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from app.menu import schemas
 from app.menu import models as menu_models
+from app.menu.router_cache import menu_router_cache
+from core.table_versions import table_versions
+from app.role.permissions import role_permissions
 from core.exceptions import BusinessException
 from fastapi import status
 from sqlalchemy.exc import IntegrityError
-from typing import List, Optional
+from typing import FrozenSet, List, Optional, Tuple
 
 
 def create_menu(db: Session, menu_in: schemas.MenuCreate) -> menu_models.Menu:
@@ -18,6 +22,8 @@ def create_menu(db: Session, menu_in: schemas.MenuCreate) -> menu_models.Menu:
         db_menu = menu_models.Menu(**menu_in.model_dump())
         db.add(db_menu)
         db.commit()
+        table_versions.bump("menus")
+        role_permissions.invalidate()
         db.refresh(db_menu)
         return db_menu
     except IntegrityError as e:
@@ -33,22 +39,55 @@ def create_menu(db: Session, menu_in: schemas.MenuCreate) -> menu_models.Menu:
 def get_menus_tree(db: Session, menu_id: Optional[int] = None) -> List[menu_models.Menu]:
     """
     获取菜单树形结构
+    一次查询取出全部菜单（按 order_num 排序），在内存中按 parent_id 组装，任意层级都只有一条 SQL；
+    children 以已加载状态写入，序列化时不会再触发懒加载
     :param db: 数据库会话
     :param menu_id: 指定获取某一个菜单（含子菜单），为空时获取所有菜单树
     :return: 树形结构菜单列表
     """
+    menus = db.query(menu_models.Menu).order_by(menu_models.Menu.order_num, menu_models.Menu.id).all()
+
+    children = {}  # parent_id -> [子菜单]，保持 order_num 顺序
+    for menu in menus:
+        children.setdefault(menu.parent_id, []).append(menu)
+    for menu in menus:
+        set_committed_value(menu, "children", children.get(menu.id, []))
+
     if menu_id:
-        # 查询指定菜单及其子菜单，添加排序
-        menus = db.query(menu_models.Menu).options(
-            joinedload(menu_models.Menu.children).joinedload(menu_models.Menu.children)
-        ).filter(menu_models.Menu.id == menu_id).order_by(menu_models.Menu.order_num).all()
-    else:
-        # 查询所有顶级菜单及其子菜单，添加排序
-        menus = db.query(menu_models.Menu).options(
-            joinedload(menu_models.Menu.children).joinedload(menu_models.Menu.children)
-        ).filter(menu_models.Menu.parent_id == None).order_by(menu_models.Menu.order_num).all()
+        return [menu for menu in menus if menu.id == menu_id]
+    return children.get(None, [])
+
+
+def _filter_menu_tree(nodes: List[schemas.MenuOut], visible: FrozenSet[int]) -> List[schemas.MenuOut]:
+    """保留可见菜单及其上级菜单"""
+    result = []
+    for node in nodes:
+        children = _filter_menu_tree(node.children or [], visible)
+        if node.id in visible or children:
+            result.append(node.model_copy(update={"children": children}))
+    return result
+
+
+def get_router_payload(
+        db: Session,
+        menu_id: Optional[int] = None,
+        role_id: Optional[str] = None,
+        full_access: bool = False
+) -> Tuple[str, bytes]:
+    """
+    /menu/getRouter 的响应（ETag 与序列化后的 JSON 字节），按菜单版本缓存
+    :param db: 数据库会话，仅在缓存未命中时使用
+    :param menu_id: 指定获取某一个菜单（含子菜单），为空时获取所有菜单树
+    :param role_id: 调用者的角色，只返回该角色可访问的菜单（及其上级菜单）
+    :param full_access: 超级用户返回全部菜单
+    """
+    def render() -> bytes:
+        menus = [schemas.MenuOut.model_validate(menu) for menu in get_menus_tree(db, menu_id)]
+        if not full_access:
+            menus = _filter_menu_tree(menus, role_permissions.get(db).menu_ids(role_id))
+        return schemas.MenuTreeResponse(data=menus, message="菜单获取成功").model_dump_json().encode()
 
-    return menus
+    return menu_router_cache.get((menu_id, "*" if full_access else role_id), render)
 
 
 # Add these functions to crud.py
@@ -76,6 +115,8 @@ def update_menu(db: Session, menu_id: int, menu_in: schemas.MenuUpdate) -> menu_
             setattr(db_menu, key, value)
 
         db.commit()
+        table_versions.bump("menus")
+        role_permissions.invalidate()
         db.refresh(db_menu)
         return db_menu
     except IntegrityError as e:
@@ -106,6 +147,8 @@ def delete_menu(db: Session, menu_id: int) -> None:
     try:
         db.delete(db_menu)
         db.commit()
+        table_versions.bump("menus")
+        role_permissions.invalidate()
     except IntegrityError as e:
         db.rollback()
         raise BusinessException(
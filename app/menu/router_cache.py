@@ -0,0 +1,52 @@
+# app/menu/router_cache.py
+# /menu/getRouter 响应体缓存：序列化后的字节与 ETag 按菜单、角色表的版本号（core.table_versions）缓存，
+# 菜单或角色变更提交后 table_versions.bump("menus") / bump("roles")，缓存随版本变化失效；
+# 多 worker 部署时其他进程感知不到版本变化，由 MENU_ROUTER_CACHE_TTL_SECONDS 兜底
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Tuple
+from core.config import settings
+from core.http_cache import make_etag
+from core.table_versions import table_versions
+
+# 菜单树内容与角色菜单关系都会影响 getRouter 的输出
+_TABLES = ("menus", "roles")
+
+
+class MenuRouterCache:
+    """
+    使用示例：
+    etag, body = menu_router_cache.get(menu_id, lambda: render(db, menu_id))
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (etag, body, expires_at, version)
+        self._max_entries = max_entries
+
+    def get(self, key: Hashable, build: Callable[[], bytes]) -> Tuple[str, bytes]:
+        now = time.monotonic()
+        version = table_versions.version(*_TABLES)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry[2] and entry[3] == version:
+                self._entries.move_to_end(key)
+                return entry[0], entry[1]
+
+        body = build()
+        etag = make_etag(body)
+        expires_at = now + settings.MENU_ROUTER_CACHE_TTL_SECONDS
+        if table_versions.in_replica_window(*_TABLES):
+            # 读请求可能走副本：变更后的粘滞窗口内生成的内容可能缺少刚提交的写入，只用到窗口结束
+            expires_at = min(expires_at, table_versions.bumped_at(*_TABLES) + settings.REPLICA_STICKY_SECONDS)
+        if table_versions.version(*_TABLES) == version:  # 生成期间菜单或角色发生变更则不缓存
+            with self._lock:
+                self._entries[key] = (etag, body, expires_at, version)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        return etag, body
+
+
+menu_router_cache = MenuRouterCache()
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
 from app.menu import schemas, crud
 from core.database import get_db
+from core.auth import get_current_user
+from core.http_cache import TableConditional, cached_json_response
 from core.schemas.base import BaseResponse
+from utils.response import fast_response
 from typing import List, Optional
 
 menu_router = APIRouter(prefix="/menu", tags=["菜单管理"])
@@ -25,20 +28,33 @@ def create(menu_in: schemas.MenuCreate, db: Session = Depends(get_db)):
     summary="获取菜单树",
     description="获取所有菜单并以树形结构返回"
 )
-def get_menu_tree(menu_id: Optional[int] = None, db: Session = Depends(get_db)):
+def get_menu_tree(
+        request: Request,
+        menu_id: Optional[int] = None,
+        db: Session = Depends(get_db)
+):
+    conditional = TableConditional(request, "menus")
+    if conditional.not_modified:
+        return conditional.not_modified_response()
     menus = crud.get_menus_tree(db, menu_id)
-    return {"data": menus, "message": "菜单获取成功"}
+    return conditional.apply(fast_response(menus, schemas.MenuListResponse, message="菜单获取成功"))
 
 
 @menu_router.get(
     "/getRouter",
     response_model=BaseResponse[List[schemas.MenuOut]],
     summary="获取菜单树",
-    description="获取所有菜单并以树形结构返回"
+    description="返回当前用户角色可访问的菜单树（超级用户返回全部菜单）；"
+                "响应带 ETag，携带 If-None-Match 且菜单未变化时返回 304"
 )
-def get_menu_tree(menu_id: Optional[int] = None, db: Session = Depends(get_db)):
-    menus = crud.get_menus_tree(db, menu_id)
-    return {"data": menus, "message": "菜单获取成功"}
+def get_menu_tree(
+        request: Request,
+        menu_id: Optional[int] = None,
+        db: Session = Depends(get_db),
+        current_user=Depends(get_current_user)
+):
+    etag, body = crud.get_router_payload(db, menu_id, current_user.role_id, current_user.is_superuser)
+    return cached_json_response(request, etag, body)
 
 
 @menu_router.put(
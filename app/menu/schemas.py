@@ -2,7 +2,7 @@
 from pydantic import BaseModel, Field, model_validator
 from typing import Optional, List
 from datetime import datetime
-from core.schemas.base import BaseResponse
+from core.schemas.base import BaseResponse, response_adapter
 from pydantic import field_validator
 
 
@@ -55,3 +55,9 @@ class MenuOut(MenuBase):
 
 
 MenuOut.model_rebuild()
+
+# /menu/getRouter 的完整响应结构
+MenuTreeResponse = BaseResponse[List[MenuOut]]
+
+# 菜单列表接口的响应序列化器（模块加载时构建）
+MenuListResponse = response_adapter(List[MenuOut])
@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List, Literal
+from core.auth import is_superuser, token_cache
+from core.hashing import hash_pool
+from core.pool import pool_status
+from core.principal import principal_cache
+from core.rate_limit import rate_limit_stats
+from core.sessions import session_stats
+from core.slow_query import reset_slow_queries, top_slow_queries
+from core.schemas.base import BaseResponse
+
+# 系统监控（仅超级用户可访问）
+monitor_router = APIRouter(prefix="/monitor", tags=["系统监控"], dependencies=[Depends(is_superuser)])
+
+
+@monitor_router.get(
+    "/pool",
+    response_model=BaseResponse[dict],
+    summary="数据库连接池状态",
+    description="各连接池的当前占用、溢出连接数，以及累计检出次数、等待时间和检出超时次数"
+)
+def get_pool_status():
+    return {"data": pool_status()}
+
+
+@monitor_router.get(
+    "/slow-queries",
+    response_model=BaseResponse[List[dict]],
+    summary="慢查询 Top-N",
+    description="按语句指纹聚合的慢查询，含调用方 crud 函数、脱敏参数与执行计划（如已开启采集）"
+)
+def list_slow_queries(
+        top: int = Query(20, ge=1, le=500),
+        order_by: Literal["total_ms", "max_ms", "count"] = "total_ms"
+):
+    return {"data": top_slow_queries(top, order_by)}
+
+
+@monitor_router.delete(
+    "/slow-queries",
+    response_model=BaseResponse[None],
+    summary="清空慢查询统计"
+)
+def clear_slow_queries():
+    reset_slow_queries()
+    return {"message": "慢查询统计已清空"}
+
+
+@monitor_router.get(
+    "/auth-cache",
+    response_model=BaseResponse[dict],
+    summary="认证缓存统计",
+    description="已验证令牌缓存与已认证主体缓存的大小、命中/未命中、容量淘汰、过期与失效次数，以及刷新令牌会话数"
+)
+def get_auth_cache_stats():
+    return {"data": {"token": token_cache.stats(), "principal": principal_cache.stats(), "sessions": session_stats()}}
+
+
+@monitor_router.get(
+    "/hashing",
+    response_model=BaseResponse[dict],
+    summary="密码哈希进程池状态",
+    description="argon2 进程池的进程数、排队深度、完成/拒绝次数，以及平均/最大耗时（含排队）与子进程计算耗时"
+)
+def get_hashing_stats():
+    return {"data": hash_pool.stats()}
+
+
+@monitor_router.get(
+    "/rate-limit",
+    response_model=BaseResponse[dict],
+    summary="登录限流状态",
+    description="按客户端地址、用户名的令牌桶数量、已耗尽的桶数，以及累计放行/拒绝与淘汰次数"
+)
+def get_rate_limit_stats():
+    return {"data": rate_limit_stats()}
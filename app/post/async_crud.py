@@ -0,0 +1,26 @@
+# app/post/async_crud.py
+# 岗位 CRUD 的异步版本，基于 AsyncSession.run_sync 复用同步实现
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.post import crud, schemas
+from uuid import UUID
+from typing import Optional
+
+
+async def create_post(db: AsyncSession, post_in: schemas.PostCreate):
+    return await db.run_sync(crud.create_post, post_in)
+
+
+async def get_all_post(db: AsyncSession):
+    return await db.run_sync(crud.get_all_post)
+
+
+async def get_post_page(db: AsyncSession, limit: int, cursor: Optional[str] = None, with_total: bool = False):
+    return await db.run_sync(crud.get_post_page, limit, cursor, with_total)
+
+
+async def update_post(db: AsyncSession, post_id: UUID, post_in: schemas.PostUpdate):
+    return await db.run_sync(crud.update_post, post_id, post_in)
+
+
+async def delete_post(db: AsyncSession, post_id: UUID):
+    return await db.run_sync(crud.delete_post, post_id)
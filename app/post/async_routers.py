@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, Query, Request, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Union
+from app.post import schemas, async_crud, crud
+from core.database import get_async_db
+from core.pagination import CursorParams
+from core.streaming import stream_list_response
+from core.http_cache import TableConditional
+from starlette.concurrency import run_in_threadpool
+from core.schemas.base import CursorPage
+from utils.response import fast_response
+from uuid import UUID
+
+# 异步模式下的岗位路由（DB_ASYNC_MODE=true 时代替同步路由注册）
+async_post_router = APIRouter(prefix="/post", tags=["岗位管理"])
+
+
+@async_post_router.post(
+    "/create",
+    response_model=schemas.BaseResponse[schemas.PostInDB],
+    summary="创建岗位",
+    description="创建新岗位"
+)
+async def create_async(dept_in: schemas.PostCreate, db: AsyncSession = Depends(get_async_db)):
+    post = await async_crud.create_post(db, dept_in)
+    return {"data": post, "message": "岗位创建成功"}
+
+
+@async_post_router.get(
+    "/list",
+    response_model=schemas.BaseResponse[Union[List[schemas.PostInDB], CursorPage[schemas.PostInDB]]],
+    summary="获取岗位列表",
+    description="不传 limit/cursor 时返回全部岗位；传入后按岗位编码游标翻页"
+)
+async def list_all_async(
+        request: Request,
+        page: CursorParams = Depends(),
+        stream: bool = Query(False, description="流式输出全部数据（未分页时生效）"),
+        db: AsyncSession = Depends(get_async_db)
+):
+    conditional = TableConditional(request, "posts")
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+    if page.enabled:
+        return conditional.apply(fast_response(await async_crud.get_post_page(db, page.limit, page.cursor, page.with_total), schemas.PostPageResponse))
+    if stream:
+        # 流式输出使用同步会话与服务端游标，在线程池中建立查询
+        return conditional.apply(await run_in_threadpool(stream_list_response, request, crud.iter_all_post, schemas.PostInDB))
+    post = await async_crud.get_all_post(db)
+    return conditional.apply(fast_response(post, schemas.PostListResponse))
+
+
+@async_post_router.put(
+    "/update/{post_id}",
+    response_model=schemas.BaseResponse[schemas.PostInDB],
+    summary="更新岗位",
+    description="更新岗位信息"
+)
+async def update_async(post_id: UUID, post_in: schemas.PostUpdate, db: AsyncSession = Depends(get_async_db)):
+    post = await async_crud.update_post(db, post_id, post_in)
+    if not post:
+        raise HTTPException(status_code=404, detail="岗位不存在")
+    return {"data": post}
+
+
+@async_post_router.delete(
+    "/delete/{dept_id}",
+    response_model=schemas.BaseResponse[Dict],
+    summary="删除部门"
+)
+async def delete_async(dept_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    success = await async_crud.delete_post(db, dept_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="部门不存在")
+    return {"message": "删除成功"}
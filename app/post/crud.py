@@ -1,9 +1,13 @@
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from starlette import status
 from app.post import models, schemas
 from uuid import UUID
 from sqlalchemy.exc import IntegrityError
-from core.exceptions import BusinessException
+from core.exceptions import BusinessException, raise_for_unique_violation
+from core.pagination import estimate_count, keyset_page
+from core.table_versions import table_versions
+from typing import Optional
 
 
 def get_post_by_name(db: Session, name: str):
@@ -15,26 +19,18 @@ def get_post_by_code(db: Session, code: str):
 
 
 def create_post(db: Session, post_in: schemas.PostCreate):
-    if get_post_by_name(db, post_in.name):
-        raise BusinessException(
-            entity="岗位名称",
-            error_type="已存在",
-        )
-    if get_post_by_code(db, post_in.code):
-        raise BusinessException(
-            entity="岗位编码",
-            error_type="已存在",
-        )
+    # 直接 INSERT ... RETURNING，名称/编码重复由唯一约束判定，一次往返
     try:
-        post = models.Post(**post_in.model_dump())
-        db.add(post)
+        post = db.scalars(insert(models.Post).values(**post_in.model_dump()).returning(models.Post)).one()
+        db.expunge(post)  # 提交后不过期，返回时无需再次查询
         db.commit()
-        db.refresh(post)
+        table_versions.bump("posts")
         return post
     except IntegrityError as e:
         db.rollback()
+        raise_for_unique_violation(e, {"name": "岗位名称", "code": "岗位编码"})
         raise BusinessException(
-            entity="department",
+            entity="post",
             error_type="database_error",
             details=str(e),
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -45,6 +41,22 @@ def get_all_post(db: Session):
     return db.query(models.Post).order_by(models.Post.code.asc()).all()
 
 
+def iter_all_post(db: Session, chunk_size: int = 500):
+    """按编码排序分批读取全部岗位（服务端游标），用于流式输出"""
+    return db.query(models.Post).order_by(models.Post.code.asc()).yield_per(chunk_size)
+
+
+def get_post_page(db: Session, limit: int, cursor: Optional[str] = None, with_total: bool = False):
+    """按岗位编码游标翻页"""
+    query = db.query(models.Post)
+    items, next_cursor = keyset_page(query, models.Post.code, models.Post.id, limit, cursor)
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "total_estimate": estimate_count(db, query) if with_total else None
+    }
+
+
 def update_post(db: Session, post_id: UUID, post_in: schemas.PostUpdate):
     db_post = db.query(models.Post).filter(models.Post.id == str(post_id)).first()
     if not db_post:
@@ -57,6 +69,7 @@ def update_post(db: Session, post_id: UUID, post_in: schemas.PostUpdate):
         for key, value in post_in.model_dump(exclude_unset=True).items():
             setattr(db_post, key, value)
         db.commit()
+        table_versions.bump("posts")
         db.refresh(db_post)
         return db_post
     except IntegrityError as e:
@@ -75,6 +88,7 @@ def delete_post(db: Session, post_id: UUID):
         if post:
             db.delete(post)
             db.commit()
+            table_versions.bump("posts")
         return post
     except IntegrityError as e:
         db.rollback()
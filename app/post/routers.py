@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Query, Request, HTTPException
 from sqlalchemy.orm import Session
-from typing import List, Dict
+from typing import List, Dict, Union
 from app.post import schemas, crud
 from core.database import get_db
+from core.pagination import CursorParams
+from core.streaming import stream_list_response
+from core.http_cache import TableConditional
+from core.schemas.base import CursorPage
+from utils.response import fast_response
 from uuid import UUID
 
 post_router = APIRouter(prefix="/post", tags=["岗位管理"])
@@ -21,12 +26,25 @@ def create(dept_in: schemas.PostCreate, db: Session = Depends(get_db)):
 
 @post_router.get(
     "/list",
-    response_model=schemas.BaseResponse[List[schemas.PostInDB]],
+    response_model=schemas.BaseResponse[Union[List[schemas.PostInDB], CursorPage[schemas.PostInDB]]],
     summary="获取岗位列表",
+    description="不传 limit/cursor 时返回全部岗位；传入后按岗位编码游标翻页"
 )
-def list_all(db: Session = Depends(get_db)):
+def list_all(
+        request: Request,
+        page: CursorParams = Depends(),
+        stream: bool = Query(False, description="流式输出全部数据（未分页时生效）"),
+        db: Session = Depends(get_db)
+):
+    conditional = TableConditional(request, "posts")
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+    if page.enabled:
+        return conditional.apply(fast_response(crud.get_post_page(db, page.limit, page.cursor, page.with_total), schemas.PostPageResponse))
+    if stream:
+        return conditional.apply(stream_list_response(request, crud.iter_all_post, schemas.PostInDB))
     post = crud.get_all_post(db)
-    return {"data": post}
+    return conditional.apply(fast_response(post, schemas.PostListResponse))
 
 
 @post_router.put(
@@ -1,8 +1,8 @@
 # apps/post/schemas.py
 from pydantic import BaseModel, Field
-from typing import Optional, TypeVar
+from typing import List, Optional, TypeVar
 from uuid import UUID
-from core.schemas.base import BaseResponse, ErrorResponse  # 引入公共模型
+from core.schemas.base import BaseResponse, CursorPage, ErrorResponse, response_adapter  # 引入公共模型
 
 T = TypeVar('T')
 
@@ -33,3 +33,8 @@ class PostInDB(PostBase):
         json_encoders = {
             UUID: lambda v: str(v)
         }
+
+
+# 列表接口的响应序列化器（模块加载时构建）
+PostListResponse = response_adapter(List[PostInDB])
+PostPageResponse = response_adapter(CursorPage[PostInDB])
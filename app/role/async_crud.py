@@ -0,0 +1,34 @@
+# app/role/async_crud.py
+# 角色 CRUD 的异步版本，基于 AsyncSession.run_sync 复用同步实现
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.role import crud, schemas
+from uuid import UUID
+from typing import Optional
+
+
+async def get_role(db: AsyncSession, role_id: UUID):
+    return await db.run_sync(crud.get_role, role_id)
+
+
+async def get_role_menu_ids(db: AsyncSession, role_id: UUID):
+    return await db.run_sync(crud.get_role_menu_ids, role_id)
+
+
+async def create_role(db: AsyncSession, role_in: schemas.RoleCreate):
+    return await db.run_sync(crud.create_role, role_in)
+
+
+async def get_all_role(db: AsyncSession):
+    return await db.run_sync(crud.get_all_role)
+
+
+async def get_role_page(db: AsyncSession, limit: int, cursor: Optional[str] = None, with_total: bool = False):
+    return await db.run_sync(crud.get_role_page, limit, cursor, with_total)
+
+
+async def update_role(db: AsyncSession, role_id: UUID, role_in: schemas.RoleUpdate):
+    return await db.run_sync(crud.update_role, role_id, role_in)
+
+
+async def delete_role(db: AsyncSession, role_id: UUID):
+    return await db.run_sync(crud.delete_role, role_id)
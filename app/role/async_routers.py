@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Union
+from app.role import schemas, async_crud, crud
+from core.database import get_async_db
+from core.pagination import CursorParams
+from core.streaming import stream_list_response
+from core.http_cache import TableConditional
+from starlette.concurrency import run_in_threadpool
+from core.schemas.base import CursorPage
+from utils.response import fast_response
+from uuid import UUID
+
+# 异步模式下的角色路由（DB_ASYNC_MODE=true 时代替同步路由注册）
+async_role_router = APIRouter(prefix="/role", tags=["角色管理"])
+
+
+@async_role_router.post(
+    "/create",
+    response_model=schemas.BaseResponse[schemas.RoleInDB],
+    summary="创建角色",
+    description="创建新角色"
+)
+async def create_async(role_in: schemas.RoleCreate, db: AsyncSession = Depends(get_async_db)):
+    post = await async_crud.create_role(db, role_in)
+    return {"data": post, "message": "角色创建成功"}
+
+
+@async_role_router.get(
+    "/list",
+    response_model=schemas.BaseResponse[Union[List[schemas.RoleInDB], CursorPage[schemas.RoleInDB]]],
+    summary="获取角色列表",
+    description="不传 limit/cursor 时返回全部角色；传入后按角色名称游标翻页"
+)
+async def list_all_async(
+        request: Request,
+        page: CursorParams = Depends(),
+        stream: bool = Query(False, description="流式输出全部数据（未分页时生效）"),
+        db: AsyncSession = Depends(get_async_db)
+):
+    conditional = TableConditional(request, "roles")
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+    if page.enabled:
+        return conditional.apply(fast_response(await async_crud.get_role_page(db, page.limit, page.cursor, page.with_total), schemas.RolePageResponse))
+    if stream:
+        # 流式输出使用同步会话与服务端游标，在线程池中建立查询
+        return conditional.apply(await run_in_threadpool(stream_list_response, request, crud.iter_all_role, schemas.RoleInDB))
+    role = await async_crud.get_all_role(db)
+    return conditional.apply(fast_response(role, schemas.RoleListResponse))
+
+
+@async_role_router.get(
+    "/menus/{role_id}",
+    response_model=schemas.BaseResponse[List[int]],
+    summary="获取角色菜单",
+    description="角色可访问的菜单ID列表"
+)
+async def get_menus_async(role_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    return {"data": await async_crud.get_role_menu_ids(db, role_id)}
+
+
+@async_role_router.put(
+    "/update/{role_id}",
+    response_model=schemas.BaseResponse[schemas.RoleInDB],
+    summary="更新角色",
+    description="更新角色信息"
+)
+async def update_async(role_id: UUID, role_in: schemas.RoleUpdate, db: AsyncSession = Depends(get_async_db)):
+    role = await async_crud.update_role(db, role_id, role_in)
+    return {"data": role, "message": "角色更新成功"}
+
+
+@async_role_router.delete(
+    "/delete/{role_id}",
+    response_model=schemas.BaseResponse[schemas.RoleInDB],
+    summary="删除角色",
+    description="删除指定角色"
+)
+async def delete_async(role_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    role = await async_crud.delete_role(db, role_id)
+    return {"data": role, "message": "角色删除成功"}
@@ -1,9 +1,15 @@
+from sqlalchemy import delete, insert, select
 from sqlalchemy.orm import Session
 from starlette import status
 from app.role import models, schemas
 from uuid import UUID
 from sqlalchemy.exc import IntegrityError
-from core.exceptions import BusinessException
+from core.exceptions import BusinessException, raise_for_unique_violation
+from core.pagination import estimate_count, keyset_page
+from typing import List, Optional
+from app.menu.models import Menu
+from core.table_versions import table_versions
+from app.role.permissions import role_permissions
 
 
 def get_role_by_name(db: Session, name: str):
@@ -14,31 +20,54 @@ def get_role(db: Session, role_id: UUID):
     return db.query(models.Role).filter(models.Role.id == str(role_id)).first()
 
 
-def create_role(db: Session, role_in: schemas.RoleCreate):
-    if get_role_by_name(db, role_in.name):
-        raise BusinessException(
-            entity="角色名称",
-            error_type="已存在",
-        )
-    # 检查权限字符是否已存在
-    existing_role = db.query(models.Role).filter(
-        models.Role.permission_key == role_in.permission_key
-    ).first()
-    if existing_role:
+def get_role_menu_ids(db: Session, role_id: UUID) -> List[int]:
+    return list(db.scalars(
+        select(models.role_menus.c.menu_id).where(models.role_menus.c.role_id == str(role_id))
+        .order_by(models.role_menus.c.menu_id)
+    ))
+
+
+def _check_menu_ids(db: Session, menu_ids: List[int]):
+    missing = set(menu_ids) - set(db.scalars(select(Menu.id).where(Menu.id.in_(menu_ids))))
+    if missing:
         raise BusinessException(
-            entity="权限字符",
-            error_type="已存在",
+            entity="菜单",
+            error_type="不存在",
+            details=f"菜单ID {sorted(missing)} 不存在",
         )
+
+
+def _replace_role_menus(db: Session, role_id: str, menu_ids: List[int]):
+    db.execute(delete(models.role_menus).where(models.role_menus.c.role_id == role_id))
+    if menu_ids:
+        db.execute(insert(models.role_menus), [{"role_id": role_id, "menu_id": menu_id} for menu_id in set(menu_ids)])
+
+
+def _permissions_changed():
+    # 角色权限索引、角色列表 ETag 与按角色过滤的 /menu/getRouter 缓存同时失效
+    role_permissions.invalidate()
+    table_versions.bump("roles")
+
+
+def create_role(db: Session, role_in: schemas.RoleCreate):
+    # 直接 INSERT ... RETURNING，名称/权限字符重复由唯一约束判定，一次往返
+    if role_in.menu_ids:
+        _check_menu_ids(db, role_in.menu_ids)
     try:
-        role = models.Role(**role_in.model_dump())
-        db.add(role)
+        role = db.scalars(
+            insert(models.Role).values(**role_in.model_dump(exclude={"menu_ids"})).returning(models.Role)
+        ).one()
+        db.expunge(role)  # 提交后不过期，返回时无需再次查询
+        if role_in.menu_ids:
+            _replace_role_menus(db, role.id, role_in.menu_ids)
         db.commit()
-        db.refresh(role)
+        _permissions_changed()
         return role
     except IntegrityError as e:
         db.rollback()
+        raise_for_unique_violation(e, {"name": "角色名称", "permission_key": "权限字符"})
         raise BusinessException(
-            entity="department",
+            entity="role",
             error_type="database_error",
             details=str(e),
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -49,6 +78,22 @@ def get_all_role(db: Session):
     return db.query(models.Role).order_by(models.Role.name.asc()).all()
 
 
+def iter_all_role(db: Session, chunk_size: int = 500):
+    """按名称排序分批读取全部角色（服务端游标），用于流式输出"""
+    return db.query(models.Role).order_by(models.Role.name.asc()).yield_per(chunk_size)
+
+
+def get_role_page(db: Session, limit: int, cursor: Optional[str] = None, with_total: bool = False):
+    """按角色名称游标翻页"""
+    query = db.query(models.Role)
+    items, next_cursor = keyset_page(query, models.Role.name, models.Role.id, limit, cursor)
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "total_estimate": estimate_count(db, query) if with_total else None
+    }
+
+
 def update_role(db: Session, role_id: UUID, role_in: schemas.RoleUpdate):
     role = get_role(db, role_id)
     if not role:
@@ -79,11 +124,17 @@ def update_role(db: Session, role_id: UUID, role_in: schemas.RoleUpdate):
                 error_type="已存在",
             )
 
+    if role_in.menu_ids:
+        _check_menu_ids(db, role_in.menu_ids)
+
     try:
-        update_data = role_in.model_dump(exclude_unset=True)
+        update_data = role_in.model_dump(exclude_unset=True, exclude={"menu_ids"})
         for key, value in update_data.items():
             setattr(role, key, value)
+        if role_in.menu_ids is not None:
+            _replace_role_menus(db, role.id, role_in.menu_ids)
         db.commit()
+        _permissions_changed()
         db.refresh(role)
         return role
     except IntegrityError as e:
@@ -108,6 +159,7 @@ def delete_role(db: Session, role_id: UUID):
     try:
         db.delete(role)
         db.commit()
+        _permissions_changed()
         return role
     except IntegrityError as e:
         db.rollback()
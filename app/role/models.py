@@ -1,10 +1,19 @@
 # 导入必要的模块和类
 from core.database import Base  # 数据库基类，用于模型继承
-from sqlalchemy import Column, String, Boolean  # SQLAlchemy字段类型
+from sqlalchemy import Column, String, Boolean, ForeignKey, Integer, Table  # SQLAlchemy字段类型
 from sqlalchemy.orm import relationship  # 用于定义表关系
 import uuid  # 用于生成UUID
 
 
+# 角色与菜单的多对多关联：角色可访问的菜单（含按钮），菜单的 permission 即该角色拥有的权限字符
+role_menus = Table(
+    "role_menus",
+    Base.metadata,
+    Column("role_id", String(36), ForeignKey("roles.id", ondelete="CASCADE"), primary_key=True),
+    Column("menu_id", Integer, ForeignKey("menus.id", ondelete="CASCADE"), primary_key=True, index=True),
+)
+
+
 # 定义Role角色模型类，继承自Base
 class Role(Base):
     # 指定数据库表名
@@ -40,3 +49,6 @@ class Role(Base):
     # relationship创建一对多关系(一个角色可以对应多个用户)
     # back_populates="role"表示在User模型中也有对应的role关系字段
     users = relationship("User", back_populates="role")
+
+    # 角色可访问的菜单
+    menus = relationship("Menu", secondary=role_menus)
@@ -0,0 +1,52 @@
+# app/role/permissions.py
+# 角色权限索引：一次查询载入 角色 -> 菜单 关联，预先计算每个角色的权限字符集合与可访问菜单集合（frozenset），
+# 权限校验为内存中的集合查找；角色或菜单变更提交后调用 role_permissions.invalidate()
+from typing import Dict, FrozenSet, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.menu.models import Menu
+from app.role.models import Role, role_menus
+from core.config import settings
+from core.snapshot import SnapshotCache
+
+
+class RolePermissions:
+    """某一时刻的角色权限快照（只读）；停用的角色没有任何权限，停用的菜单不授予权限字符"""
+
+    def __init__(self, rows):
+        permissions: Dict[str, set] = {}
+        menu_ids: Dict[str, set] = {}
+        for role_id, menu_id, permission, menu_status in rows:
+            permissions.setdefault(role_id, set())
+            menu_ids.setdefault(role_id, set())
+            if menu_id is None:
+                continue
+            menu_ids[role_id].add(menu_id)
+            if permission and menu_status:
+                permissions[role_id].add(permission)
+        self._permissions = {role_id: frozenset(values) for role_id, values in permissions.items()}
+        self._menu_ids = {role_id: frozenset(values) for role_id, values in menu_ids.items()}
+
+    def permissions(self, role_id: Optional[str]) -> FrozenSet[str]:
+        return self._permissions.get(str(role_id), frozenset()) if role_id else frozenset()
+
+    def menu_ids(self, role_id: Optional[str]) -> FrozenSet[int]:
+        return self._menu_ids.get(str(role_id), frozenset()) if role_id else frozenset()
+
+    def has_permission(self, role_id: Optional[str], permission: str) -> bool:
+        return permission in self.permissions(role_id)
+
+
+def build_role_permissions(db: Session) -> RolePermissions:
+    rows = db.execute(
+        select(Role.id, Menu.id, Menu.permission, Menu.menu_status)
+        .select_from(Role)
+        .outerjoin(role_menus, role_menus.c.role_id == Role.id)
+        .outerjoin(Menu, Menu.id == role_menus.c.menu_id)
+        .where(Role.is_active.is_(True))
+    )
+    return RolePermissions(rows)
+
+
+# 使用示例：role_permissions.get(db).has_permission(user.role_id, "system:user:list")
+role_permissions = SnapshotCache(build_role_permissions, ttl_seconds=settings.ROLE_PERMISSION_TTL_SECONDS)
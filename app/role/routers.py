@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Query, Request, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List, Dict
+from typing import List, Dict, Union
 from app.role import schemas, crud
 from core.database import get_db
+from core.pagination import CursorParams
+from core.streaming import stream_list_response
+from core.http_cache import TableConditional
+from core.schemas.base import CursorPage
+from utils.response import fast_response
 from uuid import UUID
 
 role_router = APIRouter(prefix="/role", tags=["角色管理"])
@@ -21,12 +26,35 @@ def create(role_in: schemas.RoleCreate, db: Session = Depends(get_db)):
 
 @role_router.get(
     "/list",
-    response_model=schemas.BaseResponse[List[schemas.RoleInDB]],
+    response_model=schemas.BaseResponse[Union[List[schemas.RoleInDB], CursorPage[schemas.RoleInDB]]],
     summary="获取角色列表",
+    description="不传 limit/cursor 时返回全部角色；传入后按角色名称游标翻页"
 )
-def list_all(db: Session = Depends(get_db)):
+def list_all(
+        request: Request,
+        page: CursorParams = Depends(),
+        stream: bool = Query(False, description="流式输出全部数据（未分页时生效）"),
+        db: Session = Depends(get_db)
+):
+    conditional = TableConditional(request, "roles")
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+    if page.enabled:
+        return conditional.apply(fast_response(crud.get_role_page(db, page.limit, page.cursor, page.with_total), schemas.RolePageResponse))
+    if stream:
+        return conditional.apply(stream_list_response(request, crud.iter_all_role, schemas.RoleInDB))
     role = crud.get_all_role(db)
-    return {"data": role}
+    return conditional.apply(fast_response(role, schemas.RoleListResponse))
+
+
+@role_router.get(
+    "/menus/{role_id}",
+    response_model=schemas.BaseResponse[List[int]],
+    summary="获取角色菜单",
+    description="角色可访问的菜单ID列表"
+)
+def get_menus(role_id: UUID, db: Session = Depends(get_db)):
+    return {"data": crud.get_role_menu_ids(db, role_id)}
 
 
 @role_router.put(
@@ -1,8 +1,8 @@
 # apps/role/schemas.py
 from pydantic import BaseModel, Field
-from typing import Optional, TypeVar
+from typing import List, Optional, TypeVar
 from uuid import UUID
-from core.schemas.base import BaseResponse, ErrorResponse  # 引入公共模型
+from core.schemas.base import BaseResponse, CursorPage, ErrorResponse, response_adapter  # 引入公共模型
 
 T = TypeVar('T')
 
@@ -15,7 +15,7 @@ class RoleBase(BaseModel):
 
 
 class RoleCreate(RoleBase):
-    pass
+    menu_ids: Optional[List[int]] = Field(None, description="可访问的菜单ID")
 
 
 class RoleUpdate(BaseModel):
@@ -23,6 +23,7 @@ class RoleUpdate(BaseModel):
     permission_key: Optional[str] = Field(None, min_length=3, max_length=100, description="权限字符")
     is_active: Optional[bool] = Field(None, description="是否启用")
     remark: Optional[str] = Field(None, max_length=255, description="备注")
+    menu_ids: Optional[List[int]] = Field(None, description="可访问的菜单ID，传入时整体替换")
 
 
 class RoleInDB(RoleBase):
@@ -33,3 +34,8 @@ class RoleInDB(RoleBase):
         json_encoders = {
             UUID: lambda v: str(v)
         }
+
+
+# 列表接口的响应序列化器（模块加载时构建）
+RoleListResponse = response_adapter(List[RoleInDB])
+RolePageResponse = response_adapter(CursorPage[RoleInDB])
@@ -0,0 +1,74 @@
+# app/user/async_crud.py
+# 用户 CRUD 的异步版本：数据库操作通过 AsyncSession.run_sync 复用同步实现，
+# argon2 哈希/校验属于 CPU 密集操作，交给 core.hashing 的进程池执行，事件循环只等待结果
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.user import crud, schemas
+from core.hashing import HashPoolBusy, hash_password_async, needs_rehash, verify_password_async
+from core.principal import invalidate_principal
+from core.sessions import revoke_user_sessions
+from typing import Optional, Union
+from uuid import UUID
+
+
+async def get_user_by_username(db: AsyncSession, username: str):
+    return await db.run_sync(crud.get_user_by_username, username)
+
+
+async def get_auth_user(db: AsyncSession, username: str):
+    return await db.run_sync(crud.get_auth_user, username)
+
+
+async def create_user(db: AsyncSession, user_in: schemas.UserCreate):
+    await db.run_sync(crud.check_user_unique, user_in)
+    password_hash = await hash_password_async(user_in.password)
+    return await db.run_sync(crud.create_user, user_in, password_hash)
+
+
+async def get_all_user(db: AsyncSession, dept_id: Optional[Union[UUID, str]] = None):
+    return await db.run_sync(crud.get_all_user, dept_id)
+
+
+async def get_user_page(
+        db: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        dept_id: Optional[Union[UUID, str]] = None,
+        with_total: bool = False
+):
+    return await db.run_sync(crud.get_user_page, limit, cursor, dept_id, with_total)
+
+
+async def delete_user(db: AsyncSession, user_id: UUID):
+    return await db.run_sync(crud.delete_user, user_id)
+
+
+async def update_user(db: AsyncSession, user_id: UUID, user_update: schemas.UserUpdate):
+    return await db.run_sync(crud.update_user, user_id, user_update)
+
+
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    user = await get_user_by_username(db, username)
+    if not user:
+        return False
+    if not await verify_password_async(user.password, password):
+        return False
+    if needs_rehash(user.password):
+        # 按当前 ARGON2_* 参数迁移旧哈希，进程池繁忙时跳过
+        try:
+            user.password = await hash_password_async(password)
+            await db.commit()
+        except HashPoolBusy:
+            pass
+    return user
+
+
+async def reset_password_by_info(db: AsyncSession, username: str, email: str, phone: str, new_password: str) -> bool:
+    """通过身份信息重置密码"""
+    user = await db.run_sync(crud.verify_user_identity, username, email, phone)
+    if not user:
+        return False
+    user.password = await hash_password_async(new_password)
+    await db.commit()
+    invalidate_principal(username)
+    revoke_user_sessions(username)
+    return True
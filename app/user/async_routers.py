@@ -0,0 +1,127 @@
+from fastapi import APIRouter, Depends, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.user import schemas, async_crud, crud
+from app.user.routers import RefreshedToken, Token, login_response, refresh_response, rotate_or_reject
+from core.database import get_async_db
+from typing import List, Optional, Union
+from core.exceptions import BusinessException
+from core.schemas.base import BaseResponse, CursorPage
+from core.pagination import CursorParams
+from core.streaming import stream_list_response
+from utils.response import fast_response
+from starlette.concurrency import run_in_threadpool
+from uuid import UUID
+from fastapi.security import OAuth2PasswordRequestForm
+from core.auth import load_principal_async, require_permission_async
+from core.rate_limit import check_login_rate
+
+# 异步模式下的用户路由（DB_ASYNC_MODE=true 时代替同步路由注册；批量导入、退出登录使用共用的同步路由 user_shared_router）
+async_user_router = APIRouter(prefix="/user", tags=["用户管理"])
+
+
+@async_user_router.post(
+    "/create",
+    response_model=BaseResponse[schemas.UserOut],
+    summary="创建用户",
+    description="创建新用户"
+)
+async def create_user_async(user_in: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    user = await async_crud.create_user(db, user_in)
+    return {"data": user, "message": "用户创建成功"}
+
+
+@async_user_router.delete(
+    "/delete/{user_id}",
+    response_model=BaseResponse[schemas.UserOut],
+    summary="删除用户",
+    description="永久删除指定用户",
+)
+async def delete_user_async(user_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    deleted_user = await async_crud.delete_user(db, user_id)
+    return {"data": deleted_user, "message": "用户删除成功"}
+
+
+@async_user_router.put(
+    "/update/{user_id}",
+    response_model=BaseResponse[schemas.UserOut],
+    summary="更新用户",
+    description="更新用户信息",
+)
+async def update_user_async(
+        user_id: UUID,
+        user_update: schemas.UserUpdate,
+        db: AsyncSession = Depends(get_async_db),
+):
+    updated_user = await async_crud.update_user(db, user_id, user_update)
+    return {"data": updated_user, "message": "用户更新成功"}
+
+
+@async_user_router.post("/login", response_model=BaseResponse[Token], summary="用户登录")
+async def login_async(
+        request: Request,
+        form_data: OAuth2PasswordRequestForm = Depends(),
+        db: AsyncSession = Depends(get_async_db)
+):
+    check_login_rate(request, form_data.username)
+    user = await async_crud.authenticate_user(db, form_data.username, form_data.password)
+    return login_response(user)
+
+
+@async_user_router.post(
+    "/refresh",
+    response_model=BaseResponse[RefreshedToken],
+    summary="刷新访问令牌",
+    description="用刷新令牌换取新的访问令牌，原刷新令牌作废并返回新的刷新令牌（无需重新校验密码）"
+)
+async def refresh_async(request: schemas.RefreshTokenRequest, db: AsyncSession = Depends(get_async_db)):
+    username, refresh_token = rotate_or_reject(request.refresh_token)
+    return refresh_response(username, refresh_token, await load_principal_async(db, username))
+
+
+@async_user_router.get(
+    "/list",
+    response_model=BaseResponse[Union[List[schemas.UserOut], CursorPage[schemas.UserOut]]],
+    summary="获取用户列表",
+    description="不传 limit/cursor 时返回全部用户；传入后按用户名游标翻页"
+)
+async def list_all_async(
+        request: Request,
+        dept_id: Optional[str] = None,
+        page: CursorParams = Depends(),
+        stream: bool = Query(False, description="流式输出全部数据（未分页时生效）"),
+        db: AsyncSession = Depends(get_async_db),
+        current_user=Depends(require_permission_async("system:user:list"))
+):
+    _ = current_user.username
+    if page.enabled:
+        return fast_response(await async_crud.get_user_page(db, page.limit, page.cursor, dept_id, page.with_total))
+    if stream:
+        # 流式输出使用同步会话与服务端游标，在线程池中建立查询
+        return await run_in_threadpool(
+            stream_list_response, request, lambda session: crud.iter_all_user(session, dept_id), schemas.UserOut, trusted=True
+        )
+    users_list = await async_crud.get_all_user(db, dept_id)
+    return fast_response(users_list)
+
+
+@async_user_router.post("/reset-password-by-info", response_model=BaseResponse, summary="通过账户信息重置密码")
+async def reset_password_by_information_async(
+        http_request: Request,
+        request: schemas.PasswordResetByInfo,
+        db: AsyncSession = Depends(get_async_db)
+):
+    check_login_rate(http_request, request.username)
+    success = await async_crud.reset_password_by_info(
+        db,
+        username=request.username,
+        email=request.email,
+        phone=request.phone,
+        new_password=request.new_password
+    )
+    if not success:
+        raise BusinessException(
+            entity="用户信息",
+            error_type="账户名、邮箱或手机号不匹配",
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+    return {"message": "密码重置成功，请使用新密码登录"}
@@ -2,14 +2,25 @@ from sqlalchemy.orm import Session, selectinload
 from app.user import schemas
 from app.user import models as user_models
 from app.dept import models as dept_models  # 部门模型
+from app.dept.tree import dept_tree
 from uuid import UUID
-from core.exceptions import BusinessException
+from core.exceptions import BusinessException, raise_for_unique_violation
 from fastapi import status
 from sqlalchemy.exc import IntegrityError
 from typing import Optional, Union  # 新增Union导入
-from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError, InvalidHashError
 from sqlalchemy.orm import Session, selectinload  # 确保已导入selectinload
+from core.pagination import estimate_count, keyset_page
+from app.role import models as role_models
+from app.post import models as post_models
+from sqlalchemy import insert, or_, select
+from pydantic import ValidationError
+from typing import Any, Dict, List
+from core.config import settings
+from core.principal import invalidate_principal
+from core.sessions import revoke_user_sessions
+from core.table_versions import table_versions
+from core.hashing import HashPoolBusy, hash_password, hash_passwords_bulk, needs_rehash, verify_password
+from utils.importer import chunks, validation_messages
 
 
 def get_user_by_username(db: Session, username: str):
@@ -20,6 +31,11 @@ def get_user_by_username(db: Session, username: str):
     ).filter(user_models.User.username == username).first()
 
 
+def get_auth_user(db: Session, username: str):
+    """认证用：只查询用户本身，不加载部门/角色/岗位"""
+    return db.query(user_models.User).filter(user_models.User.username == username).first()
+
+
 def get_user_by_email(db: Session, email: str):
     return db.query(user_models.User).filter(user_models.User.email == email).first()
 
@@ -29,71 +45,67 @@ def get_user_by_phone(db: Session, phone: str):
 
 
 def get_dept_and_children_ids(db: Session, dept_id: str) -> list[str]:
-    """获取部门及其所有子部门的ID列表"""
-    dept = db.query(dept_models.Dept).filter(dept_models.Dept.id == dept_id).first()
-    if not dept:
-        return []
-
-    dept_ids = [dept_id]
+    """获取部门及其所有子部门的ID列表（进程内部门树索引，无需查询数据库）"""
+    return list(dept_tree.get(db).subtree_ids(dept_id))
 
-    # 递归获取所有子部门ID
-    def get_children_ids(parent_id: str):
-        children = db.query(dept_models.Dept).filter(dept_models.Dept.parent_id == parent_id).all()
-        for child in children:
-            dept_ids.append(str(child.id))
-            get_children_ids(str(child.id))
 
-    get_children_ids(dept_id)
-    return dept_ids
+_UNIQUE_LABELS = {"username": "用户名称", "email": "邮箱", "phone": "手机号"}
 
 
-def create_user(db: Session, user_in: schemas.UserCreate):
-    # 检查用户名是否已存在
-    if get_user_by_username(db, user_in.username):
-        raise BusinessException(
-            entity="用户名称",
-            error_type="已存在",
-            status_code=status.HTTP_400_BAD_REQUEST
-        )
+def check_user_unique(db: Session, user_in: schemas.UserCreate):
+    """
+    用户名/邮箱/手机号的唯一性预检查（一次索引查询），在计算密码哈希之前调用，
+    重复提交直接返回“已存在”，不再为注定失败的插入消耗一次 argon2；并发插入仍由唯一约束兜底
+    """
+    User = user_models.User
+    values = {field: getattr(user_in, field) for field in _UNIQUE_LABELS if getattr(user_in, field) is not None}
+    existing = db.execute(
+        select(User.username, User.email, User.phone)
+        .where(or_(*(getattr(User, field) == value for field, value in values.items())))
+        .limit(1)
+    ).first()
+    if existing is None:
+        return
+    for field, value in values.items():
+        if getattr(existing, field) == value:
+            raise BusinessException(
+                entity=_UNIQUE_LABELS[field],
+                error_type="已存在",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
 
-    # 检查邮箱是否已存在
-    if get_user_by_email(db, user_in.email):
-        raise BusinessException(
-            entity="邮箱",
-            error_type="已存在",
-            status_code=status.HTTP_400_BAD_REQUEST
-        )
 
-    # 检查手机号是否已存在
-    if get_user_by_phone(db, user_in.phone):
-        raise BusinessException(
-            entity="手机号",
-            error_type="已存在",
-            status_code=status.HTTP_400_BAD_REQUEST
-        )
+def create_user(db: Session, user_in: schemas.UserCreate, password_hash: Optional[str] = None):
+    """
+    创建用户；password_hash 为调用方预先计算好的密码哈希（异步模式下在事件循环外完成哈希，调用方负责预检查）
+    先做唯一性预检查，再哈希并 INSERT ... RETURNING，预检查之后的并发重复由唯一约束判定
+    """
+    if password_hash is None:
+        check_user_unique(db, user_in)
+        password_hash = hash_password(user_in.password)  # 使用argon2加密密码（进程池）
     try:
-        ph = PasswordHasher()
-        db_user = user_models.User(
-            username=user_in.username,
-            email=user_in.email,
-            phone=user_in.phone,
-            gender=user_in.gender,
-            is_active=user_in.is_active,
-            nickname=user_in.nickname,
-            remark=user_in.remark,
-            dept_id=str(user_in.dept_id) if user_in.dept_id else None,
-            role_id=str(user_in.role_id) if user_in.role_id else None,
-            post_id=str(user_in.post_id) if user_in.post_id else None,
-            password=ph.hash(user_in.password)  # 使用argon2加密密码
-        )
-
-        # 添加到数据库
-        db.add(db_user)
+        db_user = db.scalars(
+            insert(user_models.User).values(
+                username=user_in.username,
+                email=user_in.email,
+                phone=user_in.phone,
+                gender=user_in.gender,
+                is_active=user_in.is_active,
+                nickname=user_in.nickname,
+                remark=user_in.remark,
+                dept_id=str(user_in.dept_id) if user_in.dept_id else None,
+                role_id=str(user_in.role_id) if user_in.role_id else None,
+                post_id=str(user_in.post_id) if user_in.post_id else None,
+                password=password_hash
+            ).returning(user_models.User)
+        ).one()
+        db.expunge(db_user)  # 提交后不过期，返回时无需再次查询
         db.commit()
-        db.refresh(db_user)
+        table_versions.bump("users")
         return db_user
     except IntegrityError as e:
         db.rollback()
+        raise_for_unique_violation(e, _UNIQUE_LABELS)
         raise BusinessException(
             entity="user",
             error_type="database_error",
@@ -102,11 +114,147 @@ def create_user(db: Session, user_in: schemas.UserCreate):
         )
 
 
-def get_all_user(db: Session, dept_id: Optional[Union[UUID, str]] = None):
-    query = db.query(user_models.User).options(
-        selectinload(user_models.User.dept),
-        selectinload(user_models.User.role),
-        selectinload(user_models.User.post)
+def bulk_import_users(db: Session, rows: List[Dict[str, Any]]) -> dict:
+    """
+    批量导入用户
+    1. 逐行校验字段，并检查文件内用户名/邮箱/手机号重复
+    2. 一次集合查询检查与库中已有用户的冲突，以及部门/角色/岗位是否存在
+    3. 多进程并行计算密码哈希，按批次多行插入（每批一个保存点，冲突只影响本批）
+    :return: 导入报告，errors 中的 row 为数据行序号（从 1 开始）
+    """
+    errors = {}  # row -> [错误信息]
+    candidates = []  # (row, UserCreate)
+    seen = {"username": {}, "email": {}, "phone": {}}
+    labels = _UNIQUE_LABELS
+
+    for row_no, raw in enumerate(rows, start=1):
+        try:
+            user_in = schemas.UserCreate(**raw)
+        except ValidationError as e:
+            errors[row_no] = validation_messages(e)
+            continue
+        row_errors = []
+        for field, values in seen.items():
+            value = getattr(user_in, field)
+            if value in values:
+                row_errors.append(f"{labels[field]}与第 {values[value]} 行重复")
+            else:
+                values[value] = row_no
+        if row_errors:
+            errors[row_no] = row_errors
+        else:
+            candidates.append((row_no, user_in))
+
+    # 与数据库已有数据的唯一性冲突：每批一条查询
+    existing = {"username": set(), "email": set(), "phone": set()}
+    for batch in chunks(candidates, settings.IMPORT_BATCH_SIZE):
+        usernames = [u.username for _, u in batch]
+        emails = [u.email for _, u in batch]
+        phones = [u.phone for _, u in batch]
+        result = db.execute(
+            select(user_models.User.username, user_models.User.email, user_models.User.phone).where(or_(
+                user_models.User.username.in_(usernames),
+                user_models.User.email.in_(emails),
+                user_models.User.phone.in_(phones),
+            ))
+        )
+        for username, email, phone in result:
+            existing["username"].add(username)
+            existing["email"].add(email)
+            existing["phone"].add(phone)
+
+    # 外键引用是否存在
+    referenced = {
+        "dept_id": (dept_models.Dept, "部门", {str(u.dept_id) for _, u in candidates if u.dept_id}),
+        "role_id": (role_models.Role, "角色", {str(u.role_id) for _, u in candidates if u.role_id}),
+        "post_id": (post_models.Post, "岗位", {str(u.post_id) for _, u in candidates if u.post_id}),
+    }
+    missing = {}
+    for field, (model, _, ids) in referenced.items():
+        found = set()
+        for batch in chunks(list(ids), settings.IMPORT_BATCH_SIZE):
+            found.update(db.scalars(select(model.id).where(model.id.in_(batch))))
+        missing[field] = ids - found
+
+    valid = []
+    for row_no, user_in in candidates:
+        row_errors = [f"{labels[field]}已存在" for field in existing if getattr(user_in, field) in existing[field]]
+        for field, (_, label, _) in referenced.items():
+            value = getattr(user_in, field)
+            if value and str(value) in missing[field]:
+                row_errors.append(f"{label}不存在")
+        if row_errors:
+            errors[row_no] = row_errors
+        else:
+            valid.append((row_no, user_in))
+
+    password_hashes = hash_passwords_bulk([user_in.password for _, user_in in valid])
+
+    created = 0
+    for batch in chunks(list(zip(valid, password_hashes)), settings.IMPORT_BATCH_SIZE):
+        values = [
+            {
+                "username": user_in.username,
+                "email": user_in.email,
+                "phone": user_in.phone,
+                "gender": user_in.gender,
+                "is_active": user_in.is_active,
+                "nickname": user_in.nickname,
+                "remark": user_in.remark,
+                "dept_id": str(user_in.dept_id) if user_in.dept_id else None,
+                "role_id": str(user_in.role_id) if user_in.role_id else None,
+                "post_id": str(user_in.post_id) if user_in.post_id else None,
+                "password": password_hash,
+            }
+            for (_, user_in), password_hash in batch
+        ]
+        try:
+            with db.begin_nested():
+                db.execute(insert(user_models.User), values)
+            created += len(values)
+        except IntegrityError as e:
+            # 校验之后被并发写入抢先，整批回滚到保存点
+            for (row_no, _), _ in batch:
+                errors[row_no] = [f"写入冲突，请重新导入该行：{e.orig}"]
+    db.commit()
+    table_versions.bump("users")
+
+    return {
+        "total": len(rows),
+        "created": created,
+        "failed": len(errors),
+        "errors": [
+            {"row": row_no, "name": rows[row_no - 1].get("username"), "errors": messages}
+            for row_no, messages in sorted(errors.items())
+        ]
+    }
+
+
+# 用户列表的投影列：只查询输出字段，部门/角色/岗位名称在同一条 SELECT 中外连接取得，不读取密码列
+_USER_LIST_COLUMNS = (
+    user_models.User.id,
+    user_models.User.username,
+    user_models.User.email,
+    user_models.User.nickname,
+    user_models.User.phone,
+    user_models.User.gender,
+    user_models.User.is_active,
+    user_models.User.is_superuser,
+    user_models.User.dept_id,
+    user_models.User.role_id,
+    user_models.User.post_id,
+    dept_models.Dept.name.label("dept_name"),
+    role_models.Role.name.label("role_name"),
+    post_models.Post.name.label("post_name"),
+)
+
+
+def _user_list_query(db: Session, dept_id: Optional[Union[UUID, str]] = None):
+    query = (
+        db.query(*_USER_LIST_COLUMNS)
+        .outerjoin(dept_models.Dept, dept_models.Dept.id == user_models.User.dept_id)
+        .outerjoin(role_models.Role, role_models.Role.id == user_models.User.role_id)
+        .outerjoin(post_models.Post, post_models.Post.id == user_models.User.post_id)
     )
 
     # 只有当 dept_id 是有效的 UUID 字符串时才进行筛选
@@ -123,41 +271,55 @@ def get_all_user(db: Session, dept_id: Optional[Union[UUID, str]] = None):
                 error_type="格式无效",
                 status_code=status.HTTP_400_BAD_REQUEST
             )
+    return query
+
+
+def _row_to_item(row) -> schemas.UserListItem:
+    """投影查询的一行转换为列表 DTO"""
+    return schemas.UserListItem(
+        id=row.id,
+        username=row.username,
+        email=row.email,
+        nickname=row.nickname,
+        phone=row.phone,
+        gender=row.gender.value,  # 转换为字符串值
+        is_active=row.is_active,
+        is_superuser=row.is_superuser,
+        dept_id=row.dept_id,
+        role_id=row.role_id,
+        post_id=row.post_id,
+        dept_info={"id": row.dept_id, "name": row.dept_name} if row.dept_name is not None else None,
+        role_info={"id": row.role_id, "name": row.role_name} if row.role_name is not None else None,
+        post_info={"id": row.post_id, "name": row.post_name} if row.post_name is not None else None,
+    )
+
 
-    users = query.order_by(user_models.User.username.asc()).all()
-
-    # 转换结果为字典并添加关联信息
-    result = []
-    for user in users:
-        user_data = {
-            "id": user.id,
-            "username": user.username,
-            "email": user.email,
-            "nickname": user.nickname,
-            "phone": user.phone,
-            "gender": user.gender.value,  # 转换为字符串值
-            "is_active": user.is_active,
-            "remark": user.remark,
-            "dept_id": user.dept_id,
-            "role_id": user.role_id,
-            "password": user.password,
-            "post_id": user.post_id,
-            "dept_info": {
-                "id": user.dept.id,
-                "name": user.dept.name
-            } if user.dept else None,
-            "role_info": {
-                "id": user.role.id,
-                "name": user.role.name
-            } if user.role else None,
-            "post_info": {
-                "id": user.post.id,
-                "name": user.post.name
-            } if user.post else None
-        }
-        result.append(user_data)
-
-    return result
+def get_all_user(db: Session, dept_id: Optional[Union[UUID, str]] = None):
+    rows = _user_list_query(db, dept_id).order_by(user_models.User.username.asc()).all()
+    return [_row_to_item(row) for row in rows]
+
+
+def iter_all_user(db: Session, dept_id: Optional[Union[UUID, str]] = None, chunk_size: int = 500):
+    """按用户名排序分批读取用户（服务端游标），用于流式输出；部门参数错误在调用时立即抛出"""
+    query = _user_list_query(db, dept_id).order_by(user_models.User.username.asc())
+    return (_row_to_item(row) for row in query.yield_per(chunk_size))
+
+
+def get_user_page(
+        db: Session,
+        limit: int,
+        cursor: Optional[str] = None,
+        dept_id: Optional[Union[UUID, str]] = None,
+        with_total: bool = False
+):
+    """按用户名游标翻页，每页只加载 limit 行"""
+    query = _user_list_query(db, dept_id)
+    rows, next_cursor = keyset_page(query, user_models.User.username, user_models.User.id, limit, cursor)
+    return {
+        "items": [_row_to_item(row) for row in rows],
+        "next_cursor": next_cursor,
+        "total_estimate": estimate_count(db, query) if with_total else None
+    }
 
 
 def delete_user(db: Session, user_id: UUID):
@@ -184,6 +346,9 @@ def delete_user(db: Session, user_id: UUID):
         # 执行删除操作
         db.delete(db_user)
         db.commit()
+        table_versions.bump("users")
+        invalidate_principal(db_user.username)
+        revoke_user_sessions(db_user.username)
         return db_user
     except IntegrityError as e:
         db.rollback()
@@ -235,11 +400,17 @@ def update_user(db: Session, user_id: UUID, user_update: schemas.UserUpdate):
 
     try:
         # 更新基本字段
-        update_data = user_update.model_dump(exclude_unset=True, exclude={"password"})
+        old_username = db_user.username
+        update_data = user_update.model_dump(exclude_unset=True, exclude={"password"}, mode="json")
         for field, value in update_data.items():
             setattr(db_user, field, value)
 
         db.commit()
+        table_versions.bump("users")
+        invalidate_principal(old_username, db_user.username)
+        if old_username != db_user.username:
+            # 刷新令牌按用户名绑定，改名后旧会话作废
+            revoke_user_sessions(old_username)
         db.refresh(db_user)
         return db_user
     except IntegrityError as e:
@@ -257,16 +428,17 @@ def authenticate_user(db: Session, username: str, password: str):
     user = get_user_by_username(db, username)
     if not user:
         return False
-    ph = PasswordHasher()
-    try:
-        ph.verify(user.password, password)
-        if ph.check_needs_rehash(user.password):
-            user.password = ph.hash(password)
-            db.commit()
-        return user
-    except (VerifyMismatchError, InvalidHashError):
-        # Handle both invalid password and invalid hash format
+    if not verify_password(user.password, password):
+        # 密码不匹配或哈希格式无效
         return False
+    if needs_rehash(user.password):
+        # 哈希参数已调整（ARGON2_*），登录成功时按当前参数重新计算；进程池繁忙时跳过，下次登录再迁移
+        try:
+            user.password = hash_password(password)
+            db.commit()
+        except HashPoolBusy:
+            pass
+    return user
 
 
 def verify_user_identity(db: Session, username: str, email: str, phone: str) -> Optional[user_models.User]:
@@ -283,7 +455,8 @@ def reset_password_by_info(db: Session, username: str, email: str, phone: str, n
     user = verify_user_identity(db, username, email, phone)
     if not user:
         return False
-    ph = PasswordHasher()
-    user.password = ph.hash(new_password)
+    user.password = hash_password(new_password)
     db.commit()
+    invalidate_principal(username)
+    revoke_user_sessions(username)
     return True
@@ -1,32 +1,61 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, File, Query, Request, UploadFile, status
 from sqlalchemy.orm import Session
 from app.user import schemas, crud
 from core.database import get_db
-from typing import List, Optional
+from typing import List, Optional, Union
 from core.exceptions import BusinessException
-from core.schemas.base import BaseResponse
+from core.schemas.base import BaseResponse, CursorPage, ImportReport
+from core.pagination import CursorParams
+from core.streaming import stream_list_response
 from uuid import UUID
 from fastapi.security import OAuth2PasswordRequestForm
-from core.auth import create_access_token, get_current_user  # 添加此行导入
+from core.auth import create_access_token, get_current_user, is_superuser, load_principal, require_permission  # 添加此行导入
+from core.rate_limit import check_login_rate
+from core.sessions import create_refresh_token, revoke_refresh_token, revoke_user_sessions, rotate_refresh_token
+from core.config import settings
+from core.hashing import hash_pool
+from utils.importer import read_import_rows
+from utils.response import fast_response
 from pydantic import BaseModel
 
 user_router = APIRouter(prefix="/user", tags=["用户管理"])
 
+# 两种数据库模式共用的同步路由（异步模式下不另行实现）：批量导入读取上传文件、多进程计算哈希并大批量写入，
+# 在线程池中使用同步会话；退出登录只操作会话存储，不访问数据库
+user_shared_router = APIRouter(prefix="/user", tags=["用户管理"])
 
+
+# 创建用户、登录、重置密码需要 argon2 计算：路由为 async def，同步的查询与哈希经 hash_pool.offload 在专用线程中执行
 @user_router.post(
     "/create",
     response_model=BaseResponse[schemas.UserOut],
     summary="创建用户",
     description="创建新用户"
 )
-def create_user(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
+async def create_user(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
     try:
-        user = crud.create_user(db, user_in)
+        user = await hash_pool.offload(crud.create_user, db, user_in)
         return {"data": user, "message": "用户创建成功"}
     except BusinessException as e:
         raise e
 
 
+@user_shared_router.post(
+    "/import",
+    response_model=BaseResponse[ImportReport],
+    summary="批量导入用户",
+    description="上传 CSV（首行为表头）或 JSON Lines 文件，字段同创建用户；返回逐行错误报告，校验通过的行照常导入"
+)
+def import_users(
+        file: UploadFile = File(..., description="CSV 或 JSON Lines 文件"),
+        db: Session = Depends(get_db),
+        current_user=Depends(is_superuser)
+):
+    rows = read_import_rows(file, entity="用户导入", max_rows=settings.IMPORT_MAX_ROWS)
+    report = crud.bulk_import_users(db, rows)
+    return {"data": report, "message": f"导入完成：成功 {report['created']} 条，失败 {report['failed']} 条"}
+
+
 @user_router.delete(
     "/delete/{user_id}",
     response_model=BaseResponse[schemas.UserOut],
@@ -73,16 +102,34 @@ def update_user(
 # 添加登录响应模型
 class Token(BaseModel):
     access_token: str
+    refresh_token: str
     token_type: str
     user_info: schemas.UserOut
 
 
+# 刷新令牌响应模型
+class RefreshedToken(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str
+
+
 @user_router.post("/login", response_model=BaseResponse[Token], summary="用户登录")
-def login(
+async def login(
+        request: Request,
         form_data: OAuth2PasswordRequestForm = Depends(),
         db: Session = Depends(get_db)
 ):
-    user = crud.authenticate_user(db, form_data.username, form_data.password)
+    check_login_rate(request, form_data.username)
+    return await hash_pool.offload(_login, db, form_data.username, form_data.password)
+
+
+def _login(db: Session, username: str, password: str):
+    return login_response(crud.authenticate_user(db, username, password))
+
+
+def login_response(user):
+    """构建登录成功的响应（同步/异步登录路由共用）"""
     if not user:
         raise BusinessException(
             entity="用户",
@@ -125,6 +172,7 @@ def login(
     return {
         "data": {
             "access_token": access_token,
+            "refresh_token": create_refresh_token(user.username),
             "token_type": "bearer",
             "user_info": user_data
         },
@@ -132,34 +180,101 @@ def login(
     }
 
 
+@user_router.post(
+    "/refresh",
+    response_model=BaseResponse[RefreshedToken],
+    summary="刷新访问令牌",
+    description="用刷新令牌换取新的访问令牌，原刷新令牌作废并返回新的刷新令牌（无需重新校验密码）"
+)
+def refresh(request: schemas.RefreshTokenRequest, db: Session = Depends(get_db)):
+    username, refresh_token = rotate_or_reject(request.refresh_token)
+    return refresh_response(username, refresh_token, load_principal(db, username))
+
+
+def _refresh_failed():
+    return BusinessException(
+        entity="刷新令牌",
+        error_type="无效或已过期",
+        status_code=status.HTTP_401_UNAUTHORIZED
+    )
+
+
+def rotate_or_reject(refresh_token: str) -> tuple:
+    """轮换刷新令牌，返回 (用户名, 新刷新令牌)（同步/异步刷新路由共用）"""
+    rotated = rotate_refresh_token(refresh_token)
+    if rotated is None:
+        raise _refresh_failed()
+    return rotated
+
+
+def refresh_response(username: str, refresh_token: str, principal):
+    """构建刷新成功的响应，用户已不存在时撤销其会话（同步/异步刷新路由共用）"""
+    if principal is None:
+        revoke_user_sessions(username)
+        raise _refresh_failed()
+    return {
+        "data": {
+            "access_token": create_access_token(data={"sub": username}),
+            "refresh_token": refresh_token,
+            "token_type": "bearer"
+        },
+        "message": "令牌刷新成功"
+    }
+
+
+@user_shared_router.post(
+    "/logout",
+    response_model=BaseResponse,
+    summary="退出登录",
+    description="撤销刷新令牌；已签发的访问令牌在过期前仍然有效"
+)
+def logout(request: schemas.RefreshTokenRequest):
+    revoke_refresh_token(request.refresh_token)
+    return {"message": "已退出登录"}
+
+
 # 修改现有路由添加认证保护，例如:
 @user_router.get(
     "/list",
-    response_model=BaseResponse[List[schemas.UserOut]],
+    response_model=BaseResponse[Union[List[schemas.UserOut], CursorPage[schemas.UserOut]]],
     summary="获取用户列表",
+    description="不传 limit/cursor 时返回全部用户；传入后按用户名游标翻页"
 )
 def list_all(
+        request: Request,
         dept_id: Optional[str] = None,
+        page: CursorParams = Depends(),
+        stream: bool = Query(False, description="流式输出全部数据（未分页时生效）"),
         db: Session = Depends(get_db),
-        current_user=Depends(get_current_user)  # 添加认证依赖
+        current_user=Depends(require_permission("system:user:list"))  # 登录且角色拥有用户查询权限（超级用户放行）
 ):
     # 解决未使用提示（如打印用户名）
     _ = current_user.username
+    if page.enabled:
+        return fast_response(crud.get_user_page(db, page.limit, page.cursor, dept_id, page.with_total))
+    if stream:
+        return stream_list_response(
+            request, lambda session: crud.iter_all_user(session, dept_id), schemas.UserOut, trusted=True
+        )
+    # 投影查询得到的 UserListItem 与 UserOut 字段一致，直接编码
     users_list = crud.get_all_user(db, dept_id)
-    return {"data": users_list}
+    return fast_response(users_list)
 
 
 @user_router.post("/reset-password-by-info", response_model=BaseResponse, summary="通过账户信息重置密码")
-def reset_password_by_information(
+async def reset_password_by_information(
+        http_request: Request,
         request: schemas.PasswordResetByInfo,
         db: Session = Depends(get_db)
 ):
-    success = crud.reset_password_by_info(
+    check_login_rate(http_request, request.username)
+    success = await hash_pool.offload(
+        crud.reset_password_by_info,
         db,
-        username=request.username,
-        email=request.email,
-        phone=request.phone,
-        new_password=request.new_password
+        request.username,
+        request.email,
+        request.phone,
+        request.new_password
     )
     if not success:
         raise BusinessException(
@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from pydantic import BaseModel, Field, model_validator
 from typing import Optional
 from uuid import UUID
@@ -83,8 +84,35 @@ class UserOut(BaseModel):
         from_attributes = True
 
 
+@dataclass(slots=True)
+class UserListItem:
+    """
+    用户列表的一行（投影查询结果，不含密码等敏感字段），字段与 UserOut 完全一致
+    orjson 可直接编码 dataclass，列表接口无需再转换为 dict 或经响应模型校验
+    """
+    id: str
+    username: str
+    email: str
+    nickname: Optional[str]
+    phone: str
+    gender: str
+    is_active: bool
+    is_superuser: bool
+    dept_id: Optional[str]
+    role_id: Optional[str]
+    post_id: Optional[str]
+    dept_info: Optional[dict]
+    role_info: Optional[dict]
+    post_info: Optional[dict]
+
+
 class PasswordResetByInfo(BaseModel):
     username: str = Field(..., description="账户名")
     email: str = Field(..., description="邮箱")
     phone: str = Field(..., min_length=11, max_length=20, description="手机号")
     new_password: str = Field(..., min_length=6, max_length=128, description="新密码")
+
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str = Field(..., min_length=1, max_length=256, description="登录或上次刷新返回的刷新令牌")
+
@@ -1,10 +1,19 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
+from typing import Optional
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.database import get_db, get_async_db
 from app.user import crud as user_crud
+from app.user import async_crud as user_async_crud
+from app.role.permissions import role_permissions
+from core.config import settings
+from core.principal import Principal, cache_principal, principal_cache
+from core.ttl_cache import TTLCache
 
 # 配置
 SECRET_KEY = "your-secret-key-here"  # 建议使用环境变量存储
@@ -13,6 +22,9 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/user/login")
 
+# 已验证令牌缓存：令牌摘要 -> 载荷，保留到令牌的 exp，同一令牌重复请求时不再做签名校验与解析
+token_cache = TTLCache("token", maxsize=settings.TOKEN_CACHE_SIZE)
+
 # 创建访问令牌
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -21,24 +33,75 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-# 获取当前用户
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
-    credentials_exception = HTTPException(
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="无法验证凭据",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    user = user_crud.get_user_by_username(db, username=username)
-    if user is None:
-        raise credentials_exception
-    return user
+
+
+# 校验并解析令牌，结果按令牌摘要缓存到过期时间
+def decode_token(token: str) -> dict:
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    payload = token_cache.get(key)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            raise _credentials_exception()
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            token_cache.put(key, payload, ttl=exp - time.time())
+    return payload
+
+
+# 解析令牌，返回用户名
+def decode_token_subject(token: str) -> str:
+    username = decode_token(token).get("sub")
+    if username is None:
+        raise _credentials_exception()
+    return username
+
+
+# 获取当前用户（Principal），优先读取已认证主体缓存
+def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> Principal:
+    principal = load_principal(db, decode_token_subject(token))
+    if principal is None:
+        raise _credentials_exception()
+    return principal
+
+
+# 按用户名获取 Principal（优先读缓存），用户不存在时返回 None
+def load_principal(db: Session, username: str) -> Optional[Principal]:
+    principal = principal_cache.get(username)
+    if principal is None:
+        user = user_crud.get_auth_user(db, username=username)
+        if user is None:
+            return None
+        principal = cache_principal(user)
+    return principal
+
+
+# 获取当前用户（异步模式）
+async def get_current_user_async(
+        db: AsyncSession = Depends(get_async_db),
+        token: str = Depends(oauth2_scheme)
+) -> Principal:
+    principal = await load_principal_async(db, decode_token_subject(token))
+    if principal is None:
+        raise _credentials_exception()
+    return principal
+
+
+async def load_principal_async(db: AsyncSession, username: str) -> Optional[Principal]:
+    principal = principal_cache.get(username)
+    if principal is None:
+        user = await user_async_crud.get_auth_user(db, username=username)
+        if user is None:
+            return None
+        principal = cache_principal(user)
+    return principal
 
 # 权限依赖 - 验证是否为超级用户
 def is_superuser(current_user = Depends(get_current_user)):
@@ -47,4 +110,41 @@ def is_superuser(current_user = Depends(get_current_user)):
             status_code=status.HTTP_403_FORBIDDEN,
             detail="没有足够的权限执行此操作"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+# 权限依赖 - 验证当前用户的角色是否拥有指定权限字符（菜单的 permission）
+def require_permission(permission: str):
+    """
+    超级用户直接放行，其他用户在进程内缓存的角色权限集合中查找，不额外查询数据库
+    使用示例：
+    @user_router.get("/list", dependencies=[Depends(require_permission("system:user:list"))])
+    """
+    def check_permission(current_user=Depends(get_current_user), db: Session = Depends(get_db)):
+        if current_user.is_superuser or role_permissions.get(db).has_permission(current_user.role_id, permission):
+            return current_user
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"缺少权限：{permission}"
+        )
+
+    return check_permission
+
+
+def require_permission_async(permission: str):
+    """require_permission 的异步模式版本（DB_ASYNC_MODE=true 时的路由使用），权限快照过期时在会话中重建"""
+    async def check_permission(
+            current_user=Depends(get_current_user_async),
+            db: AsyncSession = Depends(get_async_db)
+    ):
+        if current_user.is_superuser:
+            return current_user
+        snapshot = await db.run_sync(role_permissions.get)
+        if snapshot.has_permission(current_user.role_id, permission):
+            return current_user
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"缺少权限：{permission}"
+        )
+
+    return check_permission
@@ -1,7 +1,9 @@
+import re
 from fastapi import status, Request
 from typing import Optional, Union, Dict, List, Any
 from fastapi.responses import JSONResponse
 from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
 
 
 class BusinessException(Exception):
@@ -55,6 +57,54 @@ class BusinessException(Exception):
         }
 
 
+_UNIQUE_KEY_DETAIL = re.compile(r"Key \(([^)]+)\)=")
+
+
+def integrity_sqlstate(exc: IntegrityError) -> Optional[str]:
+    """完整性错误的 SQLSTATE（如 23505 唯一约束、23502 非空约束），兼容 psycopg2 与 asyncpg 驱动"""
+    orig = exc.orig
+    cause = getattr(orig, "__cause__", None) or orig  # asyncpg 的原始异常挂在 __cause__ 上
+    return getattr(orig, "pgcode", None) or getattr(cause, "sqlstate", None)
+
+
+def unique_violation_field(exc: IntegrityError) -> Optional[str]:
+    """
+    唯一约束冲突（SQLSTATE 23505）时返回冲突的列名（取不到列名时返回约束名），
+    其他完整性错误返回 None；兼容 psycopg2 与 asyncpg 驱动
+    """
+    if integrity_sqlstate(exc) != "23505":
+        return None
+    orig = exc.orig
+    cause = getattr(orig, "__cause__", None) or orig
+    diag = getattr(orig, "diag", None)
+    detail = diag.message_detail if diag is not None else getattr(cause, "detail", None)
+    match = _UNIQUE_KEY_DETAIL.search(detail or str(orig))
+    if match:
+        return match.group(1)
+    return diag.constraint_name if diag is not None else getattr(cause, "constraint_name", None)
+
+
+def raise_for_unique_violation(exc: IntegrityError, labels: Dict[str, str]):
+    """
+    唯一约束冲突转换为对应字段的“已存在”业务异常，其他错误直接返回由调用方处理
+    使用示例：
+    except IntegrityError as e:
+        db.rollback()
+        raise_for_unique_violation(e, {"name": "部门名称", "code": "部门编码"})
+    """
+    field = unique_violation_field(exc)
+    if field is None:
+        return
+    for column, label in labels.items():
+        # 列名，或唯一索引 ix_<表>_<列> / 唯一约束 <表>_<列>_key
+        if field == column or field.endswith(f"_{column}") or field.endswith(f"_{column}_key"):
+            raise BusinessException(
+                entity=label,
+                error_type="已存在",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+
 async def business_exception_handler(request: Request, exc: BusinessException):
     """全局业务异常处理器（扁平化结构）"""
     return JSONResponse(
@@ -0,0 +1,240 @@
+# core/hashing.py
+# argon2 密码哈希的进程池：哈希/校验是 CPU、内存密集操作，放到独立进程中执行，不占用请求线程的 CPU 与 GIL
+# - 交互请求（登录、创建用户、重置密码）使用有界的专用进程池，排队已满时立即返回 503，其他接口不受影响
+# - 批量导入使用单独的进程池并行计算，不挤占交互请求的队列
+# - 哈希参数取自 ARGON2_TIME_COST / ARGON2_MEMORY_COST / ARGON2_PARALLELISM，
+#   可先用 python -m utils.argon2_calibrate 在目标机器上测算；参数调整后旧哈希在用户登录时自动迁移
+import asyncio
+import functools
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+import anyio
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError, VerifyMismatchError
+from fastapi import status
+from core.config import settings
+from core.exceptions import BusinessException
+
+_bulk_executor = None
+_bulk_workers = settings.HASH_BULK_WORKERS or os.cpu_count() or 1  # 批量导入进程池的进程数
+_bulk_lock = threading.Lock()
+_worker_hasher = None
+
+
+def make_hasher() -> PasswordHasher:
+    """按当前配置的参数创建 PasswordHasher"""
+    return PasswordHasher(
+        time_cost=settings.ARGON2_TIME_COST,
+        memory_cost=settings.ARGON2_MEMORY_COST,
+        parallelism=settings.ARGON2_PARALLELISM,
+    )
+
+
+_local_hasher = make_hasher()  # 仅用于 check_needs_rehash（解析哈希参数，开销很小）
+
+
+def _get_worker_hasher() -> PasswordHasher:
+    # 在子进程内执行，PasswordHasher 每个进程只创建一次
+    global _worker_hasher
+    if _worker_hasher is None:
+        _worker_hasher = make_hasher()
+    return _worker_hasher
+
+
+def _hash_in_worker(password: str) -> str:
+    return _get_worker_hasher().hash(password)
+
+
+def _timed_hash(password: str):
+    started = time.perf_counter()
+    return _get_worker_hasher().hash(password), time.perf_counter() - started
+
+
+def _timed_verify(password_hash: str, password: str):
+    started = time.perf_counter()
+    try:
+        matched = _get_worker_hasher().verify(password_hash, password)
+    except (VerifyMismatchError, VerificationError, InvalidHashError):
+        matched = False
+    return matched, time.perf_counter() - started
+
+
+class HashPoolBusy(BusinessException):
+    """密码哈希进程池排队已满"""
+
+    def __init__(self):
+        super().__init__(
+            entity="密码服务",
+            error_type="繁忙",
+            details="当前登录请求过多，请稍后重试",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+
+class HashPool:
+    """有界的 argon2 进程池：排队（含执行中）任务数达到 max_pending 时拒绝新任务"""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._thread_limiter: Optional[anyio.CapacityLimiter] = None  # 同步路由的专用线程限额，在事件循环中创建
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+        self.restarts = 0  # 进程池损坏后重建的次数
+        self.total_latency = 0.0  # 提交到完成（含排队）的累计时间
+        self.max_latency = 0.0
+        self.total_compute = 0.0  # 子进程内实际计算的累计时间
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor):
+        """子进程异常退出（如内存不足被杀）后进程池不可再用，丢弃后由下一次提交重建"""
+        with self._lock:
+            if self._executor is not executor:
+                return  # 已被其他线程重建
+            self._executor = None
+            self.restarts += 1
+        executor.shutdown(wait=False)
+
+    def _submit(self, executor: ProcessPoolExecutor, fn, *args) -> Future:
+        """提交任务，返回结果为 (值, 计算耗时) 的 Future；队列已满时抛出 503"""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HashPoolBusy()
+            self.pending += 1
+        submitted = time.perf_counter()
+        try:
+            future = executor.submit(fn, *args)
+        except Exception:
+            with self._lock:
+                self.pending -= 1
+            raise
+        future.add_done_callback(lambda f: self._on_done(f, time.perf_counter() - submitted))
+        return future
+
+    def run(self, fn, *args):
+        """执行任务并等待结果（当前线程阻塞）；进程池损坏时重建并重试一次，仍失败返回 503"""
+        for _ in range(2):
+            executor = self._get_executor()
+            try:
+                return self._submit(executor, fn, *args).result()[0]
+            except BrokenProcessPool:
+                self._discard_executor(executor)
+        raise HashPoolBusy()
+
+    async def run_async(self, fn, *args):
+        """run 的协程版本，等待期间不阻塞事件循环"""
+        for _ in range(2):
+            executor = self._get_executor()
+            try:
+                result, _ = await asyncio.wrap_future(self._submit(executor, fn, *args))
+                return result
+            except BrokenProcessPool:
+                self._discard_executor(executor)
+        raise HashPoolBusy()
+
+    async def offload(self, fn, *args):
+        """
+        同步模式的路由中需要密码哈希的整段同步逻辑（查询、哈希、提交）放到专用线程限额内执行，
+        等待哈希结果的线程不占用 Starlette 默认线程池，突发登录不会拖慢其他同步接口；
+        限额与 max_pending 相同，用尽时立即返回 503
+        """
+        if self._thread_limiter is None:
+            self._thread_limiter = anyio.CapacityLimiter(self.max_pending)
+        if self._thread_limiter.available_tokens < 1:
+            with self._lock:
+                self.rejected += 1
+            raise HashPoolBusy()
+        return await anyio.to_thread.run_sync(functools.partial(fn, *args), limiter=self._thread_limiter)
+
+    def _on_done(self, future: Future, latency: float):
+        with self._lock:
+            self.pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+                return
+            self.completed += 1
+            self.total_latency += latency
+            self.total_compute += future.result()[1]
+            if latency > self.max_latency:
+                self.max_latency = latency
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "failed": self.failed,
+                "restarts": self.restarts,
+                "latency_avg_ms": round(self.total_latency * 1000 / self.completed, 3) if self.completed else 0.0,
+                "latency_max_ms": round(self.max_latency * 1000, 3),
+                "compute_avg_ms": round(self.total_compute * 1000 / self.completed, 3) if self.completed else 0.0,
+            }
+
+
+_hash_workers = settings.HASH_WORKERS or os.cpu_count() or 1
+hash_pool = HashPool(
+    workers=_hash_workers,
+    max_pending=settings.HASH_MAX_PENDING or _hash_workers * 2,
+)
+
+
+def hash_password(password: str) -> str:
+    """计算密码哈希（在进程池中执行，当前线程等待结果）"""
+    return hash_pool.run(_timed_hash, password)
+
+
+def verify_password(password_hash: str, password: str) -> bool:
+    """校验密码（在进程池中执行），不匹配或哈希格式无效时返回 False"""
+    return hash_pool.run(_timed_verify, password_hash, password)
+
+
+async def hash_password_async(password: str) -> str:
+    return await hash_pool.run_async(_timed_hash, password)
+
+
+async def verify_password_async(password_hash: str, password: str) -> bool:
+    return await hash_pool.run_async(_timed_verify, password_hash, password)
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """哈希参数与当前配置（ARGON2_*）不一致时需要在登录成功后重新计算"""
+    try:
+        return _local_hasher.check_needs_rehash(password_hash)
+    except InvalidHashError:
+        return False
+
+
+def _get_bulk_executor() -> ProcessPoolExecutor:
+    global _bulk_executor
+    if _bulk_executor is None:
+        with _bulk_lock:
+            if _bulk_executor is None:
+                _bulk_executor = ProcessPoolExecutor(max_workers=_bulk_workers)
+    return _bulk_executor
+
+
+def hash_passwords_bulk(passwords: List[str]) -> List[str]:
+    """批量计算密码哈希（多进程并行），返回顺序与输入一致"""
+    if not passwords:
+        return []
+    executor = _get_bulk_executor()
+    chunksize = max(1, len(passwords) // (_bulk_workers * 4))
+    return list(executor.map(_hash_in_worker, passwords, chunksize=chunksize))
@@ -0,0 +1,81 @@
+# core/http_cache.py
+# 基于 ETag 的条件请求：响应体预先序列化为字节，ETag 取内容摘要（强校验），
+# 客户端携带 If-None-Match 且与当前 ETag 一致时直接返回 304，不再发送响应体；
+# 列表接口使用 TableConditional，ETag / Last-Modified 由表版本号生成，无需先查询和序列化
+import hashlib
+import math
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+from core.table_versions import table_versions
+
+
+def make_etag(body: bytes) -> str:
+    """内容摘要作为强 ETag，相同内容在不同 worker 上得到相同的 ETag"""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match 按弱比较判断（RFC 9110），支持多个 ETag 与 *"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def cached_json_response(request: Request, etag: str, body: bytes) -> Response:
+    """返回已序列化的 JSON 响应体，或在 ETag 匹配时返回 304"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}  # 允许缓存，但每次须向服务端验证
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+class TableConditional:
+    """
+    列表接口按表版本号的条件请求（core.table_versions），判断在查询数据库之前完成
+    使用示例：
+    conditional = TableConditional(request, "depts")
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+    return conditional.apply(fast_response(crud.get_all_dept(db)))
+    """
+
+    def __init__(self, request: Request, *tables: str):
+        self.etag = table_versions.etag(tables, f"{request.url.path}?{request.url.query}")
+        self.headers = {"Cache-Control": "no-cache"}
+        self.not_modified = False
+        if self.etag is None:
+            return
+        self.headers["ETag"] = self.etag
+        last_modified = math.floor(table_versions.last_modified(*tables))
+        # Last-Modified 只有秒级精度：最近变更发生在当前这一秒内时不输出，
+        # 否则同一秒内的后续变更会得到相同的 Last-Modified，仅携带 If-Modified-Since 的客户端将误得 304
+        has_last_modified = last_modified < math.floor(time.time())
+        if has_last_modified:
+            self.headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+        if request.headers.get("if-none-match"):
+            # 同时携带时以 If-None-Match 为准（RFC 9110）
+            self.not_modified = etag_matches(request, self.etag)
+        elif has_last_modified:
+            since = _parse_http_date(request.headers.get("if-modified-since"))
+            self.not_modified = since is not None and last_modified <= since
+
+    def not_modified_response(self) -> Response:
+        return Response(status_code=304, headers=self.headers)
+
+    def apply(self, response: Response) -> Response:
+        response.headers.update(self.headers)
+        return response
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,98 @@
+# core/pagination.py
+# Keyset（游标）翻页：按 (排序键, id) 做范围定位，翻到第几页代价都一样；
+# 游标为上一页最后一行的 (排序键, id)，base64 编码后对客户端不透明
+import base64
+import json
+from typing import Optional
+from fastapi import Query as QueryParam, status
+from sqlalchemy import or_, tuple_
+from sqlalchemy.orm import Query, Session
+from core.exceptions import BusinessException
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 500
+
+
+class CursorParams:
+    """
+    列表接口的游标翻页参数（依赖注入），limit 与 cursor 都不传时保持返回全量列表
+    使用示例：
+    def list_all(page: CursorParams = Depends(), db: Session = Depends(get_db)):
+    """
+
+    def __init__(
+            self,
+            limit: Optional[int] = QueryParam(None, ge=1, le=MAX_PAGE_SIZE, description="每页条数，传入后启用游标翻页"),
+            cursor: Optional[str] = QueryParam(None, description="上一页返回的 next_cursor"),
+            with_total: bool = QueryParam(False, description="是否返回近似总数（规划器估算）"),
+    ):
+        self.limit = limit or (DEFAULT_PAGE_SIZE if cursor else None)
+        self.cursor = cursor
+        self.with_total = with_total
+
+    @property
+    def enabled(self) -> bool:
+        return self.limit is not None
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":"), ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != 2:
+            raise ValueError(cursor)
+        return values
+    except ValueError:
+        raise BusinessException(
+            entity="翻页游标",
+            error_type="格式无效",
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+
+
+def keyset_page(query: Query, sort_column, id_column, limit: int, cursor: Optional[str] = None):
+    """
+    对查询应用 keyset 翻页，排序为 sort_column ASC NULLS LAST, id ASC
+    :return: (本页数据, 下一页游标)，没有下一页时游标为 None
+    """
+    nullable = sort_column.expression.nullable
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        if sort_value is None:
+            # 已翻到排序键为 NULL 的尾部，只按 id 继续
+            query = query.filter(sort_column.is_(None), id_column > last_id)
+        else:
+            after = tuple_(sort_column, id_column) > tuple_(sort_value, last_id)
+            query = query.filter(or_(after, sort_column.is_(None)) if nullable else after)
+
+    rows = query.order_by(
+        sort_column.asc().nulls_last() if nullable else sort_column.asc(),
+        id_column.asc()
+    ).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, sort_column.key), getattr(last, id_column.key)])
+    return rows, next_cursor
+
+
+def estimate_count(db: Session, query: Query) -> Optional[int]:
+    """
+    用规划器统计估算行数（EXPLAIN 的 Plan Rows），不执行 COUNT(*)
+    结果为近似值，依赖表的 ANALYZE 统计信息
+    """
+    statement = query.order_by(None).statement.compile(
+        dialect=db.get_bind().dialect,
+        compile_kwargs={"literal_binds": True}
+    )
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}").scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,108 @@
+# core/pool.py
+# 带统计的连接池：在 SQLAlchemy 连接池取连接（_do_get）处计时，
+# 记录检出次数、等待时间与检出超时次数，供 /monitor/pool 查看
+import threading
+import time
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+
+class PoolMetrics:
+    """单个连接池的累计统计"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0  # 成功检出次数
+        self.timeouts = 0  # 等待超时次数
+        self.total_wait = 0.0  # 累计等待时间（秒）
+        self.max_wait = 0.0  # 单次最长等待时间（秒）
+
+    def record(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            if wait > self.max_wait:
+                self.max_wait = wait
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "wait_total_ms": round(self.total_wait * 1000, 3),
+                "wait_avg_ms": round(self.total_wait * 1000 / attempts, 3) if attempts else 0.0,
+                "wait_max_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+class _InstrumentedPoolMixin:
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        if self.metrics is not None:
+            self.metrics.record(time.perf_counter() - start)
+        return conn
+
+    def recreate(self):
+        # engine.dispose() 会重建连接池，统计需要延续到新池
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class InstrumentedNullPool(_InstrumentedPoolMixin, NullPool):
+    """不复用连接（配合 PgBouncer 事务模式），等待时间即建连耗时"""
+    pass
+
+
+# 已注册的引擎，name -> Engine
+_engines = {}
+
+
+def instrument_engine(name: str, engine):
+    """为引擎的连接池挂载统计并登记，async 引擎传入 async_engine.sync_engine 即可"""
+    engine.pool.metrics = PoolMetrics(name)
+    _engines[name] = engine
+    return engine
+
+
+def pool_status() -> dict:
+    """所有已登记连接池的实时状态与累计统计"""
+    result = {}
+    for name, engine in _engines.items():
+        pool = engine.pool
+        status = {"pool_class": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            status.update({
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+            })
+        metrics = getattr(pool, "metrics", None)
+        if metrics is not None:
+            status.update(metrics.snapshot())
+        result[name] = status
+    return result
@@ -0,0 +1,46 @@
+# core/principal.py
+# 已认证主体缓存：令牌 subject（用户名）-> Principal，认证依赖命中缓存时不查询数据库；
+# 用户更新、删除、重置密码（以及部门删除调整用户所属部门）后使对应条目失效，
+# 多 worker 部署时其他进程的条目最迟在 PRINCIPAL_CACHE_TTL_SECONDS 后过期
+from dataclasses import dataclass
+from typing import Optional
+from core.config import settings
+from core.ttl_cache import TTLCache
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """认证依赖返回的当前用户（只读，不含密码等敏感字段）"""
+    id: str
+    username: str
+    is_active: bool
+    is_superuser: bool
+    dept_id: Optional[str]
+    role_id: Optional[str]
+    post_id: Optional[str]
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            is_active=user.is_active,
+            is_superuser=user.is_superuser,
+            dept_id=user.dept_id,
+            role_id=user.role_id,
+            post_id=user.post_id,
+        )
+
+
+principal_cache = TTLCache("principal", maxsize=settings.PRINCIPAL_CACHE_SIZE)
+
+
+def cache_principal(user) -> Principal:
+    principal = Principal.from_user(user)
+    principal_cache.put(principal.username, principal, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+    return principal
+
+
+def invalidate_principal(*usernames: str):
+    """用户信息变更提交后调用，传入变更前后的用户名"""
+    principal_cache.invalidate(*usernames)
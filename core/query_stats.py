@@ -0,0 +1,104 @@
+# core/query_stats.py
+# 按请求统计 SQL 语句数与数据库耗时：
+# 引擎上的 cursor 事件累加到当前请求的 QueryStats（contextvars 传递，线程池/greenlet 中同样可见），
+# QueryStatsMiddleware 在响应头中输出 X-DB-Queries / X-DB-Time（流式响应除外），并写一行结构化日志
+import contextvars
+import json
+import logging
+import time
+from sqlalchemy import event
+from core.config import settings
+
+logger = logging.getLogger("s29.db")
+
+_current_stats = contextvars.ContextVar("query_stats", default=None)
+
+
+class QueryStats:
+    """单个请求内的 SQL 统计"""
+    __slots__ = ("count", "total")
+
+    def __init__(self):
+        self.count = 0  # 语句数
+        self.total = 0.0  # 数据库累计耗时（秒）
+
+
+def current_stats():
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_start"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    stats.count += 1
+    stats.total += time.perf_counter() - conn.info.pop("query_start", time.perf_counter())
+
+
+def track_queries(engine):
+    """在引擎上注册统计事件，async 引擎传入 async_engine.sync_engine"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    return engine
+
+
+class QueryStatsMiddleware:
+    """纯 ASGI 中间件：为每个 HTTP 请求建立 QueryStats，并输出响应头和日志"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_stats(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                # 流式响应（无 Content-Length）的数据在响应头发出之后才查询，此时的统计不完整，不输出响应头；
+                # 日志在响应结束后写出，包含流式输出期间的查询
+                streamed = status_code not in (204, 304) and all(name != b"content-length" for name, _ in headers)
+                if not streamed:
+                    headers.append((b"x-db-queries", str(stats.count).encode()))
+                    headers.append((b"x-db-time", f"{stats.total * 1000:.3f}".encode()))
+                    message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current_stats.reset(token)
+            _log_request(scope, status_code, stats, time.perf_counter() - started)
+
+
+def _log_request(scope, status_code: int, stats: QueryStats, elapsed: float):
+    db_time_ms = stats.total * 1000
+    flagged = (
+            stats.count > settings.DB_QUERY_WARN_COUNT
+            or db_time_ms > settings.DB_QUERY_WARN_TIME_MS
+    )
+    level = logging.WARNING if flagged else logging.INFO
+    if not logger.isEnabledFor(level):
+        return
+    logger.log(level, json.dumps({
+        "event": "db_query_stats",
+        "method": scope["method"],
+        "path": scope["path"],
+        "status": status_code,
+        "db_queries": stats.count,
+        "db_time_ms": round(db_time_ms, 3),
+        "total_ms": round(elapsed * 1000, 3),
+        "flagged": flagged,
+    }, ensure_ascii=False))
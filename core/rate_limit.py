@@ -0,0 +1,116 @@
+# core/rate_limit.py
+# 登录类接口的限流：按用户名、客户端地址各维护一个令牌桶，超出速率时直接返回 429，
+# 在查询数据库和 argon2 计算之前拒绝；桶按最近使用淘汰，内存占用受 RATE_LIMIT_MAX_KEYS 限制
+# 客户端地址取 request.client.host，部署在反向代理之后时需开启 uvicorn 的 --proxy-headers
+import heapq
+import math
+import threading
+import time
+from collections import OrderedDict
+from fastapi import HTTPException, Request, status
+from core.config import settings
+
+
+class TokenBucketLimiter:
+    """
+    令牌桶：每个键最多积攒 burst 个令牌，每秒补充 rate 个，每次请求消耗 1 个
+    使用示例：
+    limiter = TokenBucketLimiter("login_ip", burst=200, per_minute=600, maxsize=100000)
+    retry_after = limiter.acquire(key)  # 0 表示放行，否则为需要等待的秒数
+    """
+
+    def __init__(self, name: str, burst: int, per_minute: float, maxsize: int):
+        self.name = name
+        self.burst = burst
+        self.rate = per_minute / 60
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()  # key -> [剩余令牌, 上次更新时间]
+        self._exhausted = {}  # 当前已耗尽的键 -> 恢复到 1 个令牌的时间
+        self._recover_heap = []  # (恢复时间, key)，按时间顺序清理 _exhausted
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+        self.evictions = 0
+
+    def acquire(self, key: str) -> float:
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now]
+                while len(self._buckets) > self.maxsize:
+                    evicted, _ = self._buckets.popitem(last=False)
+                    self._exhausted.pop(evicted, None)
+                    self.evictions += 1
+            else:
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+                self._buckets.move_to_end(key)
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                self.allowed += 1
+                if bucket[0] < 1:
+                    # 只有消耗令牌会使桶进入耗尽状态，拒绝请求不改变恢复时间
+                    recover_at = now + (1 - bucket[0]) / self.rate if self.rate > 0 else math.inf
+                    self._exhausted[key] = recover_at
+                    heapq.heappush(self._recover_heap, (recover_at, key))
+                return 0.0
+            self.rejected += 1
+            return (1 - bucket[0]) / self.rate if self.rate > 0 else math.inf
+
+    def _expire(self, now: float):
+        # 清理已恢复的桶，每个耗尽记录只出堆一次；被淘汰或重新耗尽的旧记录与字典中的时间不一致，直接丢弃
+        heap = self._recover_heap
+        while heap and heap[0][0] <= now:
+            recover_at, key = heapq.heappop(heap)
+            if self._exhausted.get(key) == recover_at:
+                del self._exhausted[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                "buckets": len(self._buckets),
+                "maxsize": self.maxsize,
+                "exhausted": len(self._exhausted),  # 当前已耗尽（补充后仍不足 1 个令牌）的桶数
+                "burst": self.burst,
+                "per_minute": round(self.rate * 60, 3),
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+                "evictions": self.evictions,
+            }
+
+
+login_ip_limiter = TokenBucketLimiter(
+    "login_ip", settings.RATE_LIMIT_IP_BURST, settings.RATE_LIMIT_IP_PER_MINUTE, settings.RATE_LIMIT_MAX_KEYS
+)
+login_user_limiter = TokenBucketLimiter(
+    "login_user", settings.RATE_LIMIT_USER_BURST, settings.RATE_LIMIT_USER_PER_MINUTE, settings.RATE_LIMIT_MAX_KEYS
+)
+
+
+def check_login_rate(request: Request, username: str):
+    """
+    登录、通过账户信息重置密码前调用，先按客户端地址、再按用户名消耗令牌，任一耗尽时抛出 429
+    两个接口共用同一组令牌桶，避免交替调用绕过限制
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    retry_after = login_ip_limiter.acquire(request.client.host if request.client else "")
+    if not retry_after:
+        retry_after = login_user_limiter.acquire(username[:128])
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="请求过于频繁，请稍后重试",
+            headers={"Retry-After": str(max(1, math.ceil(min(retry_after, 86400))))},
+        )
+
+
+def rate_limit_stats() -> dict:
+    return {
+        "enabled": settings.RATE_LIMIT_ENABLED,
+        "ip": login_ip_limiter.stats(),
+        "username": login_user_limiter.stats(),
+    }
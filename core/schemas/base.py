@@ -1,6 +1,7 @@
 # core/schemas/base.py
-from pydantic import BaseModel
-from typing import TypeVar, Optional, Generic
+from functools import lru_cache
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import TypeVar, Optional, Generic, List
 from datetime import datetime
 
 T = TypeVar("T")
@@ -18,6 +19,37 @@ class BaseResponse(BaseModel, Generic[T]):
         }
 
 
+@lru_cache(maxsize=None)
+def response_adapter(data_type) -> TypeAdapter:
+    """
+    BaseResponse[data_type] 的 TypeAdapter，按类型缓存，校验器与序列化器只构建一次
+    在路由模块加载时创建，配合 utils.response.fast_response 使用：
+    UserListResponse = response_adapter(List[UserOut])
+    """
+    return TypeAdapter(BaseResponse[data_type])
+
+
+# 游标翻页结果
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None  # 下一页游标，为空表示已是最后一页
+    total_estimate: Optional[int] = None  # 近似总数（规划器统计），仅在请求 with_total 时返回
+
+
+# 批量导入报告
+class ImportRowError(BaseModel):
+    row: int = Field(..., description="数据行序号（从 1 开始，不含表头）")
+    name: Optional[str] = Field(None, description="行标识，如用户名、部门名称")
+    errors: List[str] = Field(..., description="错误信息")
+
+
+class ImportReport(BaseModel):
+    total: int = Field(..., description="文件中的数据行数")
+    created: int = Field(..., description="成功导入数")
+    failed: int = Field(..., description="失败数")
+    errors: List[ImportRowError] = Field(default_factory=list, description="逐行错误报告")
+
+
 class ErrorResponse(BaseModel, Generic[T]):
     """统一错误响应模型"""
     code: int  # HTTP状态码或自定义业务错误码
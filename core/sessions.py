@@ -0,0 +1,201 @@
+# core/sessions.py
+# 刷新令牌的服务端会话存储：登录成功后签发随机刷新令牌，存储中只保存其 SHA-256 摘要；
+# /user/refresh 用刷新令牌换取新的访问令牌（查一次摘要，不做 argon2 校验），同时轮换刷新令牌；
+# 重置密码、删除用户、修改用户名后撤销该用户的全部会话
+# 存储由 SESSION_STORE 选择：memory（进程内，多 worker 时各进程独立）或 sqlite（同机多 worker 共享）；
+# 其他实现继承 SessionStore 后通过 set_session_store() 替换
+import hashlib
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+from core.config import settings
+
+
+@dataclass(frozen=True, slots=True)
+class RefreshSession:
+    """一条刷新令牌会话"""
+    username: str
+    expires_at: float  # time.time() 时间戳
+
+
+class SessionStore(ABC):
+    """会话存储接口，键为刷新令牌摘要；自定义实现须实现全部抽象方法，否则实例化时报错"""
+    name = "base"
+
+    @abstractmethod
+    def create(self, token_hash: str, session: RefreshSession):
+        ...
+
+    @abstractmethod
+    def pop(self, token_hash: str) -> Optional[RefreshSession]:
+        """取出并删除会话（轮换刷新令牌时使用，同一令牌只能成功使用一次）"""
+
+    @abstractmethod
+    def revoke_user(self, *usernames: str) -> int:
+        """撤销用户的全部会话，返回撤销数量"""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        ...
+
+
+class MemorySessionStore(SessionStore):
+    name = "memory"
+
+    def __init__(self):
+        self._sessions: Dict[str, RefreshSession] = {}
+        self._by_user: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._last_purge = time.time()
+
+    def create(self, token_hash: str, session: RefreshSession):
+        with self._lock:
+            self._purge_expired()
+            self._sessions[token_hash] = session
+            self._by_user.setdefault(session.username, set()).add(token_hash)
+
+    def pop(self, token_hash: str) -> Optional[RefreshSession]:
+        with self._lock:
+            session = self._sessions.pop(token_hash, None)
+            if session is not None:
+                self._discard(session.username, token_hash)
+            return session
+
+    def revoke_user(self, *usernames: str) -> int:
+        revoked = 0
+        with self._lock:
+            for username in usernames:
+                for token_hash in self._by_user.pop(username, ()):
+                    if self._sessions.pop(token_hash, None) is not None:
+                        revoked += 1
+        return revoked
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"store": self.name, "sessions": len(self._sessions), "users": len(self._by_user)}
+
+    def _discard(self, username: str, token_hash: str):
+        hashes = self._by_user.get(username)
+        if hashes is not None:
+            hashes.discard(token_hash)
+            if not hashes:
+                del self._by_user[username]
+
+    def _purge_expired(self):
+        # 每分钟最多清理一次过期会话
+        now = time.time()
+        if now - self._last_purge < 60:
+            return
+        self._last_purge = now
+        for token_hash, session in list(self._sessions.items()):
+            if session.expires_at <= now:
+                del self._sessions[token_hash]
+                self._discard(session.username, token_hash)
+
+
+class SqliteSessionStore(SessionStore):
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "token_hash TEXT PRIMARY KEY, username TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_sessions_username ON sessions (username)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_sessions_expires_at ON sessions (expires_at)")
+        self._last_purge = 0.0
+
+    def create(self, token_hash: str, session: RefreshSession):
+        with self._lock:
+            now = time.time()
+            if now - self._last_purge >= 60:
+                self._last_purge = now
+                self._conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "INSERT INTO sessions (token_hash, username, expires_at) VALUES (?, ?, ?)",
+                (token_hash, session.username, session.expires_at)
+            )
+
+    def pop(self, token_hash: str) -> Optional[RefreshSession]:
+        with self._lock:
+            row = self._conn.execute(
+                "DELETE FROM sessions WHERE token_hash = ? RETURNING username, expires_at", (token_hash,)
+            ).fetchone()
+        return RefreshSession(username=row[0], expires_at=row[1]) if row else None
+
+    def revoke_user(self, *usernames: str) -> int:
+        if not usernames:
+            return 0
+        placeholders = ",".join("?" * len(usernames))
+        with self._lock:
+            return self._conn.execute(f"DELETE FROM sessions WHERE username IN ({placeholders})", usernames).rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            sessions, users = self._conn.execute("SELECT count(*), count(DISTINCT username) FROM sessions").fetchone()
+        return {"store": self.name, "sessions": sessions, "users": users}
+
+
+def _create_store() -> SessionStore:
+    if settings.SESSION_STORE == "sqlite":
+        return SqliteSessionStore(settings.SESSION_SQLITE_PATH)
+    return MemorySessionStore()
+
+
+session_store: SessionStore = _create_store()
+
+
+def set_session_store(store: SessionStore):
+    """替换会话存储（如 Redis 等自定义实现），需在应用启动时调用"""
+    global session_store
+    session_store = store
+
+
+def session_stats() -> dict:
+    return session_store.stats()
+
+
+def _hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def create_refresh_token(username: str) -> str:
+    token = secrets.token_urlsafe(32)
+    session_store.create(
+        _hash_token(token),
+        RefreshSession(username=username, expires_at=time.time() + settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400)
+    )
+    return token
+
+
+def rotate_refresh_token(token: str) -> Optional[Tuple[str, str]]:
+    """
+    使用刷新令牌：原令牌作废并签发新令牌
+    :return: (用户名, 新刷新令牌)，令牌不存在、已使用或已过期时返回 None
+    """
+    session = session_store.pop(_hash_token(token))
+    if session is None or session.expires_at <= time.time():
+        return None
+    return session.username, create_refresh_token(session.username)
+
+
+def revoke_refresh_token(token: str):
+    session_store.pop(_hash_token(token))
+
+
+def revoke_user_sessions(*usernames: str) -> int:
+    """用户密码重置、删除或改名后调用"""
+    return session_store.revoke_user(*usernames)
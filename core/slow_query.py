@@ -0,0 +1,202 @@
+# core/slow_query.py
+# 慢查询记录：语句耗时超过 SLOW_QUERY_THRESHOLD_MS 时记录 SQL、脱敏后的参数和发起调用的 crud 函数，
+# 按语句指纹聚合（供 /monitor/slow-queries 查看 Top-N），同时写入滚动日志文件；
+# 开启 SLOW_QUERY_EXPLAIN 后由后台线程用独立连接补采执行计划，不影响原请求的事务
+import hashlib
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from sqlalchemy import event
+from core.config import settings
+
+logger = logging.getLogger("s29.slow_query")
+
+_local = threading.local()  # explain 线程内的语句不再记录，避免递归
+_lock = threading.Lock()
+_fingerprints = {}  # fingerprint -> 聚合统计
+_explain_queue = queue.Queue(maxsize=100)
+_explain_worker = None
+
+
+def _setup_file_handler():
+    if not settings.SLOW_QUERY_LOG_FILE:
+        return
+    directory = os.path.dirname(settings.SLOW_QUERY_LOG_FILE)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    handler = RotatingFileHandler(
+        settings.SLOW_QUERY_LOG_FILE,
+        maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+        backupCount=settings.SLOW_QUERY_LOG_BACKUP_COUNT,
+        encoding="utf-8",
+    )
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    logger.addHandler(handler)
+
+
+# 语句归一化：参数占位符、字面量替换为 ?，IN 列表折叠，空白压缩
+_NORMALIZE_RULES = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"%\(\w+\)s|\$\d+|\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)"), "(...)"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def normalize_statement(statement: str) -> str:
+    for pattern, repl in _NORMALIZE_RULES:
+        statement = pattern.sub(repl, statement)
+    return statement.strip()
+
+
+def fingerprint(normalized: str) -> str:
+    return hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest()
+
+
+def redact_parameters(parameters, executemany: bool = False):
+    """参数只保留结构与类型，不记录实际值"""
+    if executemany:
+        return {"executemany_rows": len(parameters)}
+    if isinstance(parameters, dict):
+        return {key: _redact(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact(value) for value in parameters]
+    return _redact(parameters)
+
+
+def _redact(value):
+    return None if value is None else f"<{type(value).__name__}>"
+
+
+def find_caller() -> str:
+    """沿调用栈找到最近的 app.* 模块函数（通常是某个 crud 函数）"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("app."):
+            return f"{module}.{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["slow_query_start"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("slow_query_start", None)
+    if started is None or getattr(_local, "explaining", False):
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if elapsed_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+        return
+    fp = record(statement, parameters, executemany, elapsed_ms, find_caller())
+    if settings.SLOW_QUERY_EXPLAIN and not executemany and not conn.dialect.is_async and _explainable(statement):
+        try:
+            _explain_queue.put_nowait((conn.engine, statement, parameters, fp))
+        except queue.Full:
+            pass
+
+
+def record(statement: str, parameters, executemany: bool, elapsed_ms: float, caller: str) -> str:
+    """记录一次慢查询，返回语句指纹"""
+    normalized = normalize_statement(statement)
+    fp = fingerprint(normalized)
+    sample = {
+        "sql": statement,
+        "parameters": redact_parameters(parameters, executemany),
+        "caller": caller,
+        "elapsed_ms": round(elapsed_ms, 3),
+        "at": datetime.now().isoformat(timespec="seconds"),
+    }
+    with _lock:
+        entry = _fingerprints.get(fp)
+        if entry is None:
+            if len(_fingerprints) >= settings.SLOW_QUERY_MAX_FINGERPRINTS:
+                # 淘汰累计耗时最少的指纹
+                del _fingerprints[min(_fingerprints, key=lambda k: _fingerprints[k]["total_ms"])]
+            entry = _fingerprints[fp] = {
+                "fingerprint": fp,
+                "statement": normalized,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "callers": {},
+                "last_sample": None,
+                "plan": None,
+            }
+        entry["count"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        entry["callers"][caller] = entry["callers"].get(caller, 0) + 1
+        entry["last_sample"] = sample
+    logger.warning(json.dumps({"event": "slow_query", "fingerprint": fp, **sample}, ensure_ascii=False, default=str))
+    return fp
+
+
+def _explainable(statement: str) -> bool:
+    # 只对普通 SELECT 采集执行计划（EXPLAIN ANALYZE 会真实执行语句）
+    upper = statement.lstrip().upper()
+    return upper.startswith("SELECT") and " FOR UPDATE" not in upper
+
+
+def _explain_loop():
+    _local.explaining = True
+    while True:
+        engine, statement, parameters, fp = _explain_queue.get()
+        options = "ANALYZE, BUFFERS, FORMAT JSON" if settings.SLOW_QUERY_EXPLAIN_ANALYZE else "FORMAT JSON"
+        try:
+            with engine.connect() as conn:
+                with conn.begin() as trans:
+                    # EXPLAIN ANALYZE 会真实执行语句，限制耗时并始终回滚
+                    conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS)}")
+                    plan = conn.exec_driver_sql(f"EXPLAIN ({options}) {statement}", parameters).scalar()
+                    trans.rollback()
+        except Exception as e:
+            plan = {"error": str(e)}
+        with _lock:
+            entry = _fingerprints.get(fp)
+            if entry is not None:
+                entry["plan"] = plan
+        logger.warning(json.dumps({"event": "slow_query_plan", "fingerprint": fp, "plan": plan}, ensure_ascii=False, default=str))
+
+
+def track_slow_queries(engine):
+    """在引擎上注册慢查询事件，async 引擎传入 async_engine.sync_engine（不采集执行计划）"""
+    global _explain_worker
+    if settings.SLOW_QUERY_THRESHOLD_MS <= 0:
+        return engine
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    if settings.SLOW_QUERY_EXPLAIN and _explain_worker is None:
+        _explain_worker = threading.Thread(target=_explain_loop, name="slow-query-explain", daemon=True)
+        _explain_worker.start()
+    return engine
+
+
+def top_slow_queries(limit: int = 20, order_by: str = "total_ms") -> list:
+    """按累计耗时 / 最大耗时 / 次数排序的 Top-N 语句指纹"""
+    with _lock:
+        entries = [dict(entry, callers=dict(entry["callers"])) for entry in _fingerprints.values()]
+    entries.sort(key=lambda e: e[order_by], reverse=True)
+    for entry in entries[:limit]:
+        entry["total_ms"] = round(entry["total_ms"], 3)
+        entry["max_ms"] = round(entry["max_ms"], 3)
+        entry["avg_ms"] = round(entry["total_ms"] / entry["count"], 3)
+    return entries[:limit]
+
+
+def reset_slow_queries():
+    with _lock:
+        _fingerprints.clear()
+
+
+if settings.SLOW_QUERY_THRESHOLD_MS > 0:
+    _setup_file_handler()
@@ -0,0 +1,52 @@
+# core/snapshot.py
+# 进程内只读快照缓存：首次读取时用当前会话构建，写操作提交后调用 invalidate()，下次读取时重建；
+# 多 worker 部署时其他进程感知不到失效，由 ttl_seconds 兜底
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+from sqlalchemy.orm import Session
+from core.config import settings
+
+T = TypeVar("T")
+
+
+class SnapshotCache(Generic[T]):
+    """
+    使用示例：
+    dept_tree = SnapshotCache(build_dept_tree, ttl_seconds=settings.DEPT_TREE_TTL_SECONDS)
+    tree = dept_tree.get(db)
+    dept_tree.invalidate()
+    """
+
+    def __init__(self, build: Callable[[Session], T], ttl_seconds: float):
+        self._build = build
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._value: Optional[T] = None
+        self._expires_at = 0.0
+        self._invalidated_at = float("-inf")
+        self._generation = 0  # 每次失效加一，构建期间发生失效则不缓存构建结果
+
+    def get(self, db: Session) -> T:
+        value = self._value
+        if value is not None and time.monotonic() < self._expires_at:
+            return value
+        generation = self._generation
+        started = time.monotonic()
+        value = self._build(db)
+        expires_at = started + self._ttl_seconds
+        if settings.DATABASE_REPLICA_URL and started - self._invalidated_at < settings.REPLICA_STICKY_SECONDS:
+            # 读请求可能走副本：失效后的粘滞窗口内构建的快照可能缺少刚提交的写入，只用到窗口结束
+            expires_at = min(expires_at, self._invalidated_at + settings.REPLICA_STICKY_SECONDS)
+        with self._lock:
+            if generation == self._generation:
+                self._value, self._expires_at = value, expires_at
+        return value
+
+    def invalidate(self):
+        """数据变更提交后调用"""
+        with self._lock:
+            self._generation += 1
+            self._value = None
+            self._expires_at = 0.0
+            self._invalidated_at = time.monotonic()
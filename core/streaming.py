@@ -0,0 +1,66 @@
+# core/streaming.py
+# 列表接口的流式 JSON 输出：保持 {code, message, data: [...]} 响应结构，
+# 数据行通过 yield_per 分批从服务端游标读取，逐批序列化写出，内存占用与结果行数无关
+from typing import Callable, Iterable, Type
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+import json
+import logging
+import orjson
+from core.database import session_factory_for
+
+logger = logging.getLogger("s29.streaming")
+
+STREAM_CHUNK_SIZE = 500
+
+
+def stream_list_response(
+        request: Request,
+        rows_factory: Callable[[Session], Iterable],
+        schema: Type[BaseModel],
+        message: str = "success",
+        code: int = 200,
+        trusted: bool = False,
+) -> StreamingResponse:
+    """
+    流式返回列表
+    :param request: 当前请求，用于选择主库/副本会话
+    :param rows_factory: 接收会话、返回数据行迭代器的函数（查询参数错误等应在此处立即抛出）
+    :param schema: 单行的响应模型，与非流式接口的输出字段保持一致
+    :param trusted: 数据行已是与 schema 字段一致的 dict / dataclass（crud 构建）时直接 orjson 编码，不再逐行校验
+    """
+    # 流式输出在路由返回后才开始，依赖注入的会话届时已关闭，这里使用独立会话
+    db = session_factory_for(request)()
+    try:
+        rows = iter(rows_factory(db))
+    except Exception:
+        db.close()
+        raise
+
+    head = json.dumps({"code": code, "message": message}, ensure_ascii=False)[:-1] + ',"data":['
+
+    def generate():
+        try:
+            yield head.encode()
+            first = True
+            chunk = []
+            for row in rows:
+                item = orjson.dumps(row).decode() if trusted else schema.model_validate(row).model_dump_json()
+                chunk.append(item if first else "," + item)
+                first = False
+                if len(chunk) >= STREAM_CHUNK_SIZE:
+                    yield "".join(chunk).encode()
+                    chunk = []
+            if chunk:
+                yield "".join(chunk).encode()
+            yield b"]}"
+        except Exception:
+            # 响应头已发出，无法再改状态码；中断输出，客户端将收到不完整的 JSON
+            logger.exception("流式输出中断: %s", request.url.path)
+            raise
+        finally:
+            db.close()
+
+    return StreamingResponse(generate(), media_type="application/json")
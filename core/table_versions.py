@@ -0,0 +1,78 @@
+# core/table_versions.py
+# 按表的数据版本号：各 crud 模块的创建/更新/删除在提交后调用 table_versions.bump(表名)，
+# 列表接口用相关表的版本号生成 ETag / Last-Modified，条件请求命中时直接返回 304，不查询数据库、不序列化
+# - 版本号只在进程内递增，ETag 中带进程标识，不同 worker 的 ETag 不会互相误判
+# - 多 worker 部署时其他进程感知不到变更，ETag 按 TABLE_VERSION_TTL_SECONDS 周期轮换兜底
+# - 启用只读副本时，变更后的粘滞窗口内不输出 ETag（副本可能尚未同步，避免把旧数据缓存在新版本号下）
+import hashlib
+import secrets
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from core.config import settings
+
+
+class TableVersions:
+    """
+    使用示例：
+    table_versions.bump("depts")
+    table_versions.version("menus", "roles")  # -> (菜单版本, 角色版本)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        self._bumped_at: Dict[str, float] = {}  # 表 -> 最近一次变更的 time.monotonic()
+        self._modified_at: Dict[str, float] = {}  # 表 -> 最近一次变更的 time.time()，用于 Last-Modified
+        self._epoch = secrets.token_hex(4)  # 进程标识
+        self._started_at = time.time()
+
+    def bump(self, *tables: str):
+        """数据变更提交后调用"""
+        monotonic, wall = time.monotonic(), time.time()
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+                self._bumped_at[table] = monotonic
+                self._modified_at[table] = wall
+
+    def version(self, *tables: str) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in tables)
+
+    def bumped_at(self, *tables: str) -> float:
+        """相关表最近一次变更的 time.monotonic()，从未变更时为 -inf"""
+        with self._lock:
+            return max((self._bumped_at.get(table, float("-inf")) for table in tables), default=float("-inf"))
+
+    def in_replica_window(self, *tables: str) -> bool:
+        """启用只读副本且相关表刚变更（读请求可能读到副本上的旧数据）"""
+        return bool(settings.DATABASE_REPLICA_URL) and (
+            time.monotonic() - self.bumped_at(*tables) < settings.REPLICA_STICKY_SECONDS
+        )
+
+    def _window(self) -> int:
+        ttl = settings.TABLE_VERSION_TTL_SECONDS
+        return int(time.time() // ttl) if ttl > 0 else 0
+
+    def etag(self, tables: Tuple[str, ...], variant: str = "") -> Optional[str]:
+        """
+        由表版本号生成强 ETag，variant 区分同一组表上的不同输出（如查询参数）
+        副本粘滞窗口内返回 None，此时不应输出 ETag
+        """
+        if self.in_replica_window(*tables):
+            return None
+        versions = ".".join(str(v) for v in self.version(*tables))
+        digest = hashlib.blake2b(variant.encode(), digest_size=6).hexdigest()
+        return f'"{self._epoch}-{self._window()}-{versions}-{digest}"'
+
+    def last_modified(self, *tables: str) -> float:
+        """相关表最近一次变更的时间戳（不早于进程启动与当前 ETag 轮换周期的开始）"""
+        ttl = settings.TABLE_VERSION_TTL_SECONDS
+        window_start = self._window() * ttl if ttl > 0 else 0
+        with self._lock:
+            modified = max((self._modified_at.get(table, 0.0) for table in tables), default=0.0)
+        return max(modified, self._started_at, window_start)
+
+
+table_versions = TableVersions()
@@ -1,5 +1,7 @@
+import logging
 import uvicorn
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -11,16 +13,22 @@ from app.menu import models as menu_models
 from app.document import models as document_models
 
 # 统一导入所有路由
-from app.dept.routers import dept_router
+from app.dept.routers import dept_router, dept_shared_router
 from app.post.routers import post_router
 from app.role.routers import role_router
-from app.user.routers import user_router
+from app.user.routers import user_router, user_shared_router
 from app.menu.routers import menu_router
+from app.monitor.routers import monitor_router
 
+from core.config import settings
 from core.exceptions import BusinessException, business_exception_handler
 from core.exception_handlers import validation_exception_handler
+from core.query_stats import QueryStatsMiddleware
 
-app = FastAPI()
+logging.basicConfig(level=settings.LOG_LEVEL, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+
+# 默认使用 orjson 编码响应体
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # 添加CORS中间件（如果需要）
 app.add_middleware(
@@ -31,16 +39,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 按请求统计 SQL 语句数与耗时（X-DB-Queries / X-DB-Time 响应头）
+app.add_middleware(QueryStatsMiddleware)
+
 # 注册异常处理器
 app.add_exception_handler(BusinessException, business_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 
-# 注册路由
-app.include_router(dept_router)
-app.include_router(post_router)
-app.include_router(role_router)
-app.include_router(user_router)
-app.include_router(menu_router)
+# 注册路由：按 DB_ASYNC_MODE 只注册异步或同步实现中的一套，同一路径只有一个处理函数
+if settings.DB_ASYNC_MODE:
+    from app.dept.async_routers import async_dept_router
+    from app.post.async_routers import async_post_router
+    from app.role.async_routers import async_role_router
+    from app.user.async_routers import async_user_router
+    from app.menu.async_routers import async_menu_router
+
+    mode_routers = [async_dept_router, async_post_router, async_role_router, async_user_router, async_menu_router]
+else:
+    mode_routers = [dept_router, post_router, role_router, user_router, menu_router]
+
+for router in mode_routers:
+    app.include_router(router)
+
+# 两种模式共用、有意保持同步实现的路由：
+# - 部门/用户批量导入、退出登录（见各 routers 模块中 *_shared_router 的说明）
+# - 系统监控：读取进程内统计，权限校验使用同步会话
+app.include_router(dept_shared_router)
+app.include_router(user_shared_router)
+app.include_router(monitor_router)
 
 if __name__ == "__main__":
     uvicorn.run(app, host="127.0.0.1", port=8000)
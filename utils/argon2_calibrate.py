@@ -0,0 +1,78 @@
+# utils/argon2_calibrate.py
+# argon2 参数测算：在当前机器上按目标耗时与内存预算给出 ARGON2_* 建议值
+# 策略（参考 RFC 9106）：内存取预算内的最大值，再逐步增加迭代次数直到接近目标耗时；
+# 迭代 1 次仍超出目标时内存减半重试
+# 使用示例：python -m utils.argon2_calibrate --target-ms 250 --max-memory-mib 64
+import argparse
+import os
+import statistics
+import time
+from argon2 import PasswordHasher
+from core.config import settings
+
+_MIN_MEMORY_KIB = 8 * 1024
+_MAX_TIME_COST = 20
+
+
+def measure(time_cost: int, memory_cost: int, parallelism: int, rounds: int) -> float:
+    """单次哈希耗时的中位数（毫秒）"""
+    hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    hasher.hash("calibration-warmup")
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hasher.hash("calibration-password")
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def calibrate(target_ms: float, max_memory_kib: int, parallelism: int, rounds: int):
+    """
+    :return: (建议的 (time_cost, memory_cost, 耗时毫秒), 全部测量结果)
+    """
+    results = []
+    best = None
+    memory_cost = max_memory_kib
+    while memory_cost >= _MIN_MEMORY_KIB:
+        for time_cost in range(1, _MAX_TIME_COST + 1):
+            elapsed = measure(time_cost, memory_cost, parallelism, rounds)
+            results.append((time_cost, memory_cost, elapsed))
+            if elapsed > target_ms:
+                break
+            best = (time_cost, memory_cost, elapsed)
+        if best is not None:
+            return best, results
+        memory_cost //= 2
+    return best, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测算当前机器的 argon2 参数")
+    parser.add_argument("--target-ms", type=float, default=250, help="单次哈希的目标耗时（毫秒）")
+    parser.add_argument("--max-memory-mib", type=int, default=64, help="单次哈希的内存预算（MiB）")
+    parser.add_argument("--parallelism", type=int, default=min(4, os.cpu_count() or 1), help="并行度（lanes）")
+    parser.add_argument("--rounds", type=int, default=3, help="每组参数的测量次数")
+    args = parser.parse_args()
+
+    print(
+        f"当前配置：time_cost={settings.ARGON2_TIME_COST} memory_cost={settings.ARGON2_MEMORY_COST}KiB "
+        f"parallelism={settings.ARGON2_PARALLELISM}，"
+        f"耗时 {measure(settings.ARGON2_TIME_COST, settings.ARGON2_MEMORY_COST, settings.ARGON2_PARALLELISM, args.rounds):.1f}ms"
+    )
+    best, results = calibrate(args.target_ms, args.max_memory_mib * 1024, args.parallelism, args.rounds)
+    print(f"{'time_cost':>10} {'memory(KiB)':>12} {'耗时(ms)':>10}")
+    for time_cost, memory_cost, elapsed in results:
+        print(f"{time_cost:>10} {memory_cost:>12} {elapsed:>10.1f}")
+
+    if best is None:
+        print(f"内存 {_MIN_MEMORY_KIB // 1024}MiB、迭代 1 次仍超过 {args.target_ms}ms，请放宽目标耗时")
+        return
+    time_cost, memory_cost, elapsed = best
+    print(f"\n建议参数（约 {elapsed:.1f}ms / 次，单进程同时只能处理 1 次哈希，吞吐约 {1000 / elapsed:.1f} 次/秒/进程）：")
+    print(f"ARGON2_TIME_COST={time_cost}")
+    print(f"ARGON2_MEMORY_COST={memory_cost}")
+    print(f"ARGON2_PARALLELISM={args.parallelism}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# utils/importer.py
+# 批量导入文件解析：支持 CSV（首行为表头）、JSON Lines（每行一个 JSON 对象）
+# 以及 .json 文件（对象数组，可用 children 嵌套表达树形结构）
+
+import csv
+import io
+import json
+from typing import Any, Dict, List
+from fastapi import UploadFile, status
+from core.exceptions import BusinessException
+
+
+def read_import_rows(file: UploadFile, entity: str, max_rows: int) -> List[Dict[str, Any]]:
+    """读取上传文件为字典列表；CSV 中的空单元格视为未填写（不出现在字典中）"""
+    try:
+        content = file.file.read().decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise BusinessException(entity=entity, error_type="文件编码须为UTF-8")
+
+    filename = (file.filename or "").lower()
+    if filename.endswith(".csv") or file.content_type == "text/csv":
+        rows = [
+            {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+            for row in csv.DictReader(io.StringIO(content))
+        ]
+    elif filename.endswith(".json"):
+        try:
+            document = json.loads(content)
+        except json.JSONDecodeError as e:
+            raise BusinessException(entity=entity, error_type="文件格式错误", details=f"不是合法的 JSON：{e}")
+        rows = flatten_tree(document if isinstance(document, list) else [document], entity)
+    else:
+        rows = []
+        for line_no, line in enumerate(content.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                raise BusinessException(entity=entity, error_type="文件格式错误", details=f"第 {line_no} 行不是合法的 JSON")
+            if not isinstance(row, dict):
+                raise BusinessException(entity=entity, error_type="文件格式错误", details=f"第 {line_no} 行不是 JSON 对象")
+            rows.append(row)
+
+    if len(rows) > max_rows:
+        raise BusinessException(
+            entity=entity,
+            error_type="超出行数限制",
+            details=f"单次最多导入 {max_rows} 行",
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+    return rows
+
+
+def flatten_tree(nodes: list, entity: str, children_key: str = "children") -> List[Dict[str, Any]]:
+    """
+    嵌套树按先序展开为字典列表，子节点通过 _parent_row 记录父节点的行序号（从 1 开始），
+    不带 children 的对象数组展开后与 JSON Lines 相同
+    """
+    rows = []
+    stack = [(node, None) for node in reversed(nodes)]
+    while stack:
+        node, parent_row = stack.pop()
+        if not isinstance(node, dict):
+            raise BusinessException(entity=entity, error_type="文件格式错误", details="数组元素必须是 JSON 对象")
+        row = {key: value for key, value in node.items() if key != children_key}
+        if parent_row is not None:
+            row["_parent_row"] = parent_row
+        rows.append(row)
+        children = node.get(children_key) or []
+        if not isinstance(children, list):
+            raise BusinessException(entity=entity, error_type="文件格式错误", details=f"{children_key} 必须是数组")
+        row_no = len(rows)
+        stack.extend((child, row_no) for child in reversed(children))
+    return rows
+
+
+def chunks(items: list, size: int):
+    """按 size 切分列表，用于分批查询与多行插入（控制单条 SQL 的参数个数）"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def validation_messages(exc) -> List[str]:
+    """pydantic ValidationError 转为简短的错误信息列表"""
+    messages = []
+    for error in exc.errors():
+        field = ".".join(str(loc) for loc in error["loc"])
+        msg = error.get("msg", "Invalid value")
+        if msg.startswith("Value error, "):
+            msg = msg[13:]
+        messages.append(f"{field}: {msg}" if field else msg)
+    return messages
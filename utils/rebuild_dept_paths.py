@@ -0,0 +1,20 @@
+# utils/rebuild_dept_paths.py
+# 部门物化路径重建：按 parent_id 重新生成全部部门的 path / depth，用于手工修改 parent_id 后的数据修复
+# 升级已有数据库时的回填由 alembic 迁移完成，无需单独执行
+# 使用示例：python -m utils.rebuild_dept_paths
+from app.user.models import User  # noqa: F401  注册关系映射涉及的模型
+from app.post.models import Post  # noqa: F401
+from app.role.models import Role  # noqa: F401
+from app.menu.models import Menu  # noqa: F401
+from app.dept.crud import rebuild_dept_paths
+from core.database import SessionLocal
+
+
+def main():
+    with SessionLocal() as db:
+        updated = rebuild_dept_paths(db)
+    print(f"已重建 {updated} 个部门的路径")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,34 @@
 # utils/response.py
 
-from typing import Any
-from fastapi.responses import JSONResponse
+from typing import Any, Optional
+import orjson
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import TypeAdapter
 
 
 def success(data: Any = None, message: str = "操作成功", code: int = 200):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=code,
         content={"code": code, "message": message, "data": data}
     )
 
 
 def error(message: str = "操作失败", code: int = 400):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=code,
         content={"code": code, "message": message, "data": None}
     )
+
+
+def fast_response(data: Any = None, adapter: Optional[TypeAdapter] = None, message: str = "success", code: int = 200):
+    """
+    直接返回 Response，跳过 FastAPI 按 response_model 的再次校验与 jsonable_encoder（response_model 仍用于接口文档）
+    :param adapter: 为空时 data 必须是 crud 构建、字段与响应模型完全一致的 dict / dataclass 等数据，直接 orjson 编码；
+                    否则用预构建的 TypeAdapter（core.schemas.base.response_adapter）校验 ORM 对象并由 pydantic-core 输出 JSON
+    """
+    content = {"code": code, "message": message, "data": data}
+    if adapter is None:
+        body = orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    return Response(content=body, status_code=code, media_type="application/json")